@@ -10,8 +10,11 @@ fix_metadata.py — Rebuild metadata.json with all corrections.
 6. Remove "Infant feeding bottle" if present
 """
 
+import functools
+import hashlib
 import json
 import os
+import re
 import sys
 from pathlib import Path
 
@@ -20,16 +23,19 @@ SVG_DIR = REPO / "svg"
 METADATA_FILE = REPO / "metadata.json"
 
 # ─── Acronyms / tokens that must stay uppercase ───
-UPPERCASE_TOKENS = {
+UPPERCASE_TOKENS = frozenset({
     "UN", "NGO", "IDP", "COVID-19", "AI", "API", "PDF", "CSV",
     "XLSX", "DOCX", "ZIP", "UX", "UI", "E-mail", "P-code", "CCCM",
-}
+})
 
 # For matching inside hyphenated words or standalone words
-UPPERCASE_WORDS = {
+UPPERCASE_WORDS = frozenset({
     "UN", "NGO", "IDP", "AI", "API", "PDF", "CSV",
     "XLSX", "DOCX", "ZIP", "UX", "UI",
-}
+})
+
+# Case-folded word → canonical spelling; one probe per word in to_sentence_case
+TOKEN_CASE = {t.casefold(): t for t in UPPERCASE_TOKENS | UPPERCASE_WORDS}
 
 # ─── Old key → New key mapping (the 13 renames) ───
 KEY_RENAMES = {
@@ -56,6 +62,16 @@ FAMILY_OVERRIDES = {
     "Resettlement": "People",
 }
 
+# ─── Hyphenated tokens restored after sentence-casing ───
+TOKEN_FIXES = {
+    "E mail": "E-mail",
+    "e mail": "E-mail",
+    "P code": "P-code",
+    "p code": "P-code",
+    "COVID 19": "COVID-19",
+}
+_TOKEN_FIX_RE = re.compile(r"\b(?:" + "|".join(map(re.escape, TOKEN_FIXES)) + r")\b")
+
 # ─── Explicit display-name overrides (new key → display name) ───
 DISPLAY_NAME_OVERRIDES = {
     "Camp-coordination-and-camp-management": "Camp coordination and camp management",
@@ -68,54 +84,45 @@ DISPLAY_NAME_OVERRIDES = {
 }
 
 
+@functools.lru_cache(maxsize=None)
 def to_sentence_case(name: str) -> str:
     """Convert a display name to sentence case, preserving acronyms."""
-    # Handle special tokens that contain hyphens first
-    # We process word by word, but need to handle "E-mail", "P-code", "COVID-19" as units.
-
-    # Strategy: split on spaces, then for each token check if it's an acronym
-    words = name.split()
+    # Single pass over the words: each word (or hyphen-separated part) is
+    # case-folded once and dispatched on acronym membership and on whether
+    # it opens the name. "E-mail", "P-code" etc. are restored afterwards by
+    # key_to_display_name.
     result = []
 
-    for i, word in enumerate(words):
-        # Check if the entire word (including hyphens) is a known uppercase token
-        if word.upper() in {"COVID-19"}:
-            result.append("COVID-19")
-            continue
-        if word in UPPERCASE_WORDS or word.upper() in UPPERCASE_WORDS:
-            # Check if it's actually a recognized acronym
-            if word.upper() in UPPERCASE_WORDS:
-                result.append(word.upper())
-                continue
-
+    for i, word in enumerate(name.split()):
         # Check for "(CCCM)" suffix — we remove it
         if word == "(CCCM)" or word == "CCCM":
             continue
 
-        # For the first word: capitalize first letter, rest lowercase
-        # For subsequent words: all lowercase
-        # But respect acronyms within hyphenated words
-        if "-" in word:
-            # Handle hyphenated words like "E-mail", "P-code"
-            parts = word.split("-")
-            new_parts = []
-            for j, part in enumerate(parts):
-                if part.upper() in UPPERCASE_WORDS:
-                    new_parts.append(part.upper())
-                elif i == 0 and j == 0:
-                    new_parts.append(part.capitalize())
-                else:
-                    new_parts.append(part.lower())
-            result.append("-".join(new_parts))
-        else:
-            if i == 0:
-                result.append(word[0].upper() + word[1:].lower() if len(word) > 1 else word.upper())
+        # Whole-word tokens (including hyphens) keep their canonical casing
+        token = TOKEN_CASE.get(word.casefold())
+        if token is not None:
+            result.append(token)
+            continue
+
+        # First letter of the name is capitalized, everything else lowercase,
+        # except acronyms inside hyphenated words like "UX-UI"
+        capitalize = i == 0
+        new_parts = []
+        for part in (word.split("-") if "-" in word else (word,)):
+            token = TOKEN_CASE.get(part.casefold())
+            if token is not None:
+                new_parts.append(token)
+            elif capitalize:
+                new_parts.append(part.capitalize())
             else:
-                result.append(word.lower())
+                new_parts.append(part.lower())
+            capitalize = False
+        result.append("-".join(new_parts))
 
     return " ".join(result)
 
 
+@functools.lru_cache(maxsize=None)
 def key_to_display_name(key: str) -> str:
     """Convert a key like 'Abduction-kidnapping' to display name 'Abduction kidnapping'."""
     # Check overrides first
@@ -134,13 +141,22 @@ def key_to_display_name(key: str) -> str:
 
     # Restore hyphens in known tokens
     # "E mail" → "E-mail", "P code" → "P-code", "COVID 19" → "COVID-19"
-    name = name.replace("E mail", "E-mail")
-    name = name.replace("e mail", "E-mail")  # just in case
-    name = name.replace("P code", "P-code")
-    name = name.replace("p code", "P-code")
-    name = name.replace("COVID 19", "COVID-19")
+    return _TOKEN_FIX_RE.sub(lambda m: TOKEN_FIXES[m.group(0)], name)
+
 
-    return name
+def write_if_changed(path: Path, data: bytes) -> bool:
+    """Atomically write data to path unless the file already holds it.
+
+    Returns True if the file was (re)written.
+    """
+    if path.is_file():
+        if hashlib.sha256(path.read_bytes()).digest() == hashlib.sha256(data).digest():
+            return False
+
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+    return True
 
 
 def main():
@@ -152,14 +168,26 @@ def main():
     changes_log = []
 
     # ─── 2. Scan SVG folder for actual filenames ───
-    svg_files = sorted(f for f in os.listdir(SVG_DIR) if f.endswith(".svg"))
+    with os.scandir(SVG_DIR) as it:
+        svg_files = sorted(
+            e.name for e in it
+            if e.name.endswith(".svg") and e.is_file(follow_symlinks=False)
+        )
     new_keys = [f[:-4] for f in svg_files]  # strip .svg
 
     print(f"SVG files found: {len(new_keys)}")
     print(f"Old metadata entries: {len(old_icons)}")
 
-    # ─── 3. Build reverse lookup: new_key → old_key ───
-    reverse_renames = {v: k for k, v in KEY_RENAMES.items()}
+    # ─── 3. Index old entries by their new key (single pass over old_icons) ───
+    old_by_new = {}
+    confirmed_removed = []
+    for old_key, entry in old_icons.items():
+        new_key = KEY_RENAMES.get(old_key, old_key)
+        if old_key in KEY_RENAMES or new_key not in old_by_new:
+            old_by_new[new_key] = (old_key, entry)
+        lowered = old_key.lower()
+        if "infant" in lowered and "feeding" in lowered and "bottle" in lowered:
+            confirmed_removed.append(f"CONFIRMED REMOVED: '{old_key}' was in old metadata")
 
     # ─── 4. Build new icons dict ───
     new_icons = {}
@@ -167,11 +195,9 @@ def main():
 
     for new_key in new_keys:
         # Find the corresponding old entry
-        old_key = reverse_renames.get(new_key, new_key)
+        old_key, old_entry = old_by_new.get(new_key, (new_key, None))
 
-        if old_key in old_icons:
-            old_entry = old_icons[old_key]
-        else:
+        if old_entry is None:
             missing_from_old.append(new_key)
             # Shouldn't happen, but create a default
             old_entry = {
@@ -229,31 +255,23 @@ def main():
             del new_icons[key]
 
     # Also check old metadata
-    for key in old_icons:
-        if "infant" in key.lower() and "feeding" in key.lower() and "bottle" in key.lower():
-            changes_log.append(f"CONFIRMED REMOVED: '{key}' was in old metadata")
+    changes_log.extend(confirmed_removed)
 
     # ─── 6. Sort by key alphabetically and assign codepoints ───
+    # Rebuild new_icons in sorted order (dicts keep insertion order) and
+    # assign U+E001 through U+E185 in the same pass.
     sorted_keys = sorted(new_icons.keys(), key=str.casefold)
-    codepoint = 0xE001
-    for key in sorted_keys:
-        cp_str = f"U+E{codepoint - 0xE000:03X}"
-        # Format: U+E001 through U+E185
-        cp_hex = f"U+{codepoint:04X}"
-        new_icons[key]["font_codepoint"] = cp_hex
-        codepoint += 1
+    new_icons = {key: new_icons[key] for key in sorted_keys}
+    for i, entry in enumerate(new_icons.values()):
+        entry["font_codepoint"] = f"U+{0xE001 + i:04X}"
 
+    codepoint = 0xE001 + len(new_icons)
     next_codepoint = f"U+{codepoint:04X}"
 
-    # ─── 7. Build ordered icons dict (sorted by key) ───
-    ordered_icons = {}
-    for key in sorted_keys:
-        ordered_icons[key] = new_icons[key]
-
-    # ─── 8. Build families list ───
+    # ─── 7. Build families list ───
     # Collect all unique families from icons, maintaining desired order
     families_set = set()
-    for entry in ordered_icons.values():
+    for entry in new_icons.values():
         families_set.add(entry["family"])
 
     # Use a preferred ordering, adding any extras at the end
@@ -288,11 +306,11 @@ def main():
     for fam in sorted(families_set):
         families.append(fam)
 
-    # ─── 9. Remove "Unassigned" from families if no icons use it ───
-    used_families = {e["family"] for e in ordered_icons.values()}
+    # ─── 8. Remove "Unassigned" from families if no icons use it ───
+    used_families = {e["family"] for e in new_icons.values()}
     families = [f for f in families if f in used_families]
 
-    # ─── 10. Build final metadata ───
+    # ─── 9. Build final metadata ───
     metadata = {
         "meta": {
             "version": "2.0",
@@ -300,24 +318,23 @@ def main():
             "next_font_codepoint": next_codepoint,
         },
         "families": families,
-        "icons": ordered_icons,
+        "icons": new_icons,
     }
 
-    # ─── 11. Write output ───
-    with open(METADATA_FILE, "w") as f:
-        json.dump(metadata, f, indent=2, ensure_ascii=False)
-        f.write("\n")
+    # ─── 10. Write output ───
+    new_bytes = json.dumps(metadata, indent=2, ensure_ascii=False).encode("utf-8") + b"\n"
+    written = write_if_changed(METADATA_FILE, new_bytes)
 
-    # ─── 12. Print summary ───
+    # ─── 11. Print summary ───
     print(f"\n{'='*70}")
     print(f"METADATA REBUILD SUMMARY")
     print(f"{'='*70}")
-    print(f"Total icons: {len(ordered_icons)}")
+    print(f"Total icons: {len(new_icons)}")
     print(f"Total families: {len(families)}")
     print(f"Families: {families}")
     print(f"Codepoint range: U+E001 – {f'U+{codepoint-1:04X}'}")
     print(f"Next codepoint: {next_codepoint}")
-    print(f"Wordmark icons: {sum(1 for v in ordered_icons.values() if v['wordmark'])}")
+    print(f"Wordmark icons: {sum(1 for v in new_icons.values() if v['wordmark'])}")
 
     # Count changes by type
     key_renames = [c for c in changes_log if c.startswith("KEY RENAME")]
@@ -349,18 +366,21 @@ def main():
 
     # Verify wordmark icons
     print(f"\n--- WORDMARK ICONS (43 expected) ---")
-    wm = {k: v for k, v in ordered_icons.items() if v["wordmark"]}
+    wm = {k: v for k, v in new_icons.items() if v["wordmark"]}
     for k, v in sorted(wm.items()):
         print(f"  {k}: valign={v['wordmark_valign']}")
     print(f"  Total: {len(wm)}")
 
     # Verify CCCM wordmark_valign
     cccm_key = "Camp-coordination-and-camp-management"
-    if cccm_key in ordered_icons:
-        print(f"\n  CCCM entry: wordmark={ordered_icons[cccm_key]['wordmark']}, valign={ordered_icons[cccm_key]['wordmark_valign']}")
+    if cccm_key in new_icons:
+        print(f"\n  CCCM entry: wordmark={new_icons[cccm_key]['wordmark']}, valign={new_icons[cccm_key]['wordmark_valign']}")
 
     print(f"\n{'='*70}")
-    print("Done. metadata.json has been written.")
+    if written:
+        print("Done. metadata.json has been written.")
+    else:
+        print("Done. metadata.json is already up to date.")
 
 
 if __name__ == "__main__":
@@ -19,6 +19,7 @@ import sys
 from pathlib import Path
 
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
 from openpyxl.utils import get_column_letter
 
@@ -44,6 +45,7 @@ HEADER_BORDER = Border(
 CELL_BORDER = Border(
     bottom=Side(style="thin", color="D6DCE4"),
 )
+CELL_ALIGNMENT = Alignment(vertical="center")
 
 
 def load_metadata() -> dict:
@@ -52,86 +54,70 @@ def load_metadata() -> dict:
         return json.load(f)
 
 
-def build_rows(metadata: dict) -> list[list[str]]:
+def build_rows(icons: dict[str, dict], families_order: list[str]) -> list[list[str]]:
     """
-    Build a list of row data from the metadata, respecting family order
-    and alphabetical sorting within each family.
+    Build a list of row data from the metadata icons, respecting family
+    order and alphabetical sorting within each family.
 
     Each row: [Family, Icon name, Date added]
     """
-    families_order = metadata["families"]
-    icons = metadata["icons"]
+    # Rank families by their canonical order; families not listed (safety
+    # net) follow in order of first appearance.
+    family_rank = {f: i for i, f in enumerate(families_order)}
+    for icon in icons.values():
+        family_rank.setdefault(icon["family"], len(family_rank))
+
+    # One sort yields family grouping and alphabetical order within each
+    sorted_icons = sorted(
+        icons.values(),
+        key=lambda i: (family_rank[i["family"]], i["name"].lower()),
+    )
 
-    # Group icons by family
-    family_icons: dict[str, list[dict]] = {f: [] for f in families_order}
-    for _key, icon in icons.items():
-        family = icon["family"]
-        if family in family_icons:
-            family_icons[family].append(icon)
-        else:
-            # Safety net for icons whose family isn't listed
-            family_icons.setdefault(family, []).append(icon)
-
-    rows: list[list[str]] = []
-    for family in families_order:
-        sorted_icons = sorted(family_icons[family], key=lambda i: i["name"].lower())
-        for icon in sorted_icons:
-            rows.append([
-                family,
-                icon["name"],
-                icon.get("date_added", ""),
-            ])
-
-    # Append any icons from families not in the canonical order
-    known_families = set(families_order)
-    for family, icons_list in family_icons.items():
-        if family not in known_families:
-            sorted_icons = sorted(icons_list, key=lambda i: i["name"].lower())
-            for icon in sorted_icons:
-                rows.append([
-                    family,
-                    icon["name"],
-                    icon.get("date_added", ""),
-                ])
-
-    return rows
+    return [
+        [icon["family"], icon["name"], icon.get("date_added", "")]
+        for icon in sorted_icons
+    ]
 
 
 def auto_fit_columns(ws, headers: list[str], rows: list[list[str]]) -> None:
     """Set each column width to fit the widest cell content, with padding."""
-    for col_idx, header in enumerate(headers, start=1):
-        max_len = len(str(header))
-        for row in rows:
-            cell_len = len(str(row[col_idx - 1]))
-            if cell_len > max_len:
-                max_len = cell_len
+    # Single pass over the rows, tracking every column's maximum at once
+    widths = [len(str(header)) for header in headers]
+    for row in rows:
+        for col_idx, value in enumerate(row):
+            cell_len = len(value) if isinstance(value, str) else len(str(value))
+            if cell_len > widths[col_idx]:
+                widths[col_idx] = cell_len
+
+    for col_idx, max_len in enumerate(widths, start=1):
         # Add padding (2 characters) for comfortable reading
         ws.column_dimensions[get_column_letter(col_idx)].width = max_len + 4
 
 
+def styled_cell(ws, value: str, font: Font, border: Border, fill: PatternFill | None = None) -> WriteOnlyCell:
+    """Return a write-only cell carrying the given value and styles."""
+    cell = WriteOnlyCell(ws, value=value)
+    cell.font = font
+    cell.border = border
+    cell.alignment = CELL_ALIGNMENT
+    if fill is not None:
+        cell.fill = fill
+    return cell
+
+
 def create_workbook(rows: list[list[str]]) -> Workbook:
-    """Create and return a styled openpyxl Workbook."""
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Humanitarian Icons"
+    """Create and return a styled, write-only openpyxl Workbook.
 
-    headers = ["Family", "Icon name", "Date added"]
+    Rows are streamed straight to the sheet XML instead of being held as an
+    in-memory cell grid.
+    """
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Humanitarian Icons")
 
-    # --- Header row ---
-    for col_idx, header in enumerate(headers, start=1):
-        cell = ws.cell(row=1, column=col_idx, value=header)
-        cell.font = HEADER_FONT
-        cell.fill = HEADER_FILL
-        cell.border = HEADER_BORDER
-        cell.alignment = Alignment(vertical="center")
+    headers = ["Family", "Icon name", "Date added"]
 
-    # --- Data rows ---
-    for row_idx, row_data in enumerate(rows, start=2):
-        for col_idx, value in enumerate(row_data, start=1):
-            cell = ws.cell(row=row_idx, column=col_idx, value=value)
-            cell.font = CELL_FONT
-            cell.border = CELL_BORDER
-            cell.alignment = Alignment(vertical="center")
+    # Write-only sheets emit their column/view settings with the first row,
+    # so everything sheet-level must be configured before appending.
 
     # --- Column widths ---
     auto_fit_columns(ws, headers, rows)
@@ -142,6 +128,13 @@ def create_workbook(rows: list[list[str]]) -> Workbook:
     # Set print title (repeat header on every printed page)
     ws.print_title_rows = "1:1"
 
+    # --- Header row ---
+    ws.append([styled_cell(ws, h, HEADER_FONT, HEADER_BORDER, HEADER_FILL) for h in headers])
+
+    # --- Data rows ---
+    for row_data in rows:
+        ws.append([styled_cell(ws, value, CELL_FONT, CELL_BORDER) for value in row_data])
+
     return wb
 
 
@@ -153,7 +146,7 @@ def main() -> None:
     icons = metadata["icons"]
     print(f"  Found {len(icons)} icons across {len(families)} families")
 
-    rows = build_rows(metadata)
+    rows = build_rows(icons, families)
 
     wb = create_workbook(rows)
 
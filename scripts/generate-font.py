@@ -5,19 +5,40 @@ generate-font.py — Generate an icon font from OCHA humanitarian SVG icons.
 Reads metadata.json for permanently assigned Unicode codepoints (U+E001, etc.)
 and builds an SVG-in-OpenType font (.ttf + .woff2) plus an HTML reference page.
 
+Usage:
+    python scripts/generate-font.py [--woff2-only] [--woff2-quality N]
+
+--woff2-quality sets the Brotli level (0-11) used for the WOFF2 tables:
+11 (the default) gives the smallest file for releases, ~4 is much faster
+for local iteration.
+
 Dependencies: fonttools, brotli  (install via pip)
+Optional:     lxml  (faster SVG parsing; falls back to xml.etree otherwise)
 """
 
+import argparse
+import hashlib
+import html
+import io
 import json
 import os
 import re
 import sys
 import time
-from xml.etree import ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
 from fontTools import ttLib
+from fontTools.ttLib import woff2
 from fontTools.fontBuilder import FontBuilder
 from fontTools.ttLib.tables.S_V_G_ import SVGDocument
+from fontTools.ttLib.tables._g_l_y_f import Glyph
+
+try:
+    from lxml import etree as ET
+    HAVE_LXML = True
+except ImportError:
+    from xml.etree import ElementTree as ET
+    HAVE_LXML = False
 
 # ---------------------------------------------------------------------------
 # Configuration
@@ -29,6 +50,13 @@ UPM = 1000          # units per em
 ASCENT = 800
 DESCENT = -200
 
+# Brotli quality for WOFF2 output (0-11; 11 is smallest and slowest)
+WOFF2_QUALITY = 11
+
+# SVG reading: threads prefetching files, and the os.read() buffer size
+READER_THREADS = 8
+READ_CHUNK_SIZE = 64 * 1024
+
 # ---------------------------------------------------------------------------
 # Paths
 # ---------------------------------------------------------------------------
@@ -40,13 +68,28 @@ OUTPUT_DIR = os.path.join(REPO_ROOT, "output", "font")
 TTF_PATH = os.path.join(OUTPUT_DIR, "ocha-humanitarian-icons.ttf")
 WOFF2_PATH = os.path.join(OUTPUT_DIR, "ocha-humanitarian-icons.woff2")
 HTML_PATH = os.path.join(OUTPUT_DIR, "index.html")
+# Cleaned glyph bodies keyed by source content (see cached_clean_path)
+SVG_CACHE_DIR = os.path.join(OUTPUT_DIR, ".svgcache")
 
 
 # ---------------------------------------------------------------------------
 # SVG cleaning helpers
 # ---------------------------------------------------------------------------
 SVG_NS = "http://www.w3.org/2000/svg"
-ET.register_namespace("", SVG_NS)
+
+if HAVE_LXML:
+    # One parser shared by every icon. Blank text, comments and processing
+    # instructions never make it into the glyph documents.
+    XML_PARSER = ET.XMLParser(
+        remove_blank_text=True,
+        remove_comments=True,
+        remove_pis=True,
+        huge_tree=False,
+    )
+else:
+    # xml.etree's default parser already drops comments and PIs
+    XML_PARSER = None
+    ET.register_namespace("", SVG_NS)
 
 STRIP_ELEMENTS = {
     f"{{{SVG_NS}}}defs",
@@ -56,35 +99,73 @@ STRIP_ELEMENTS = {
 
 STRIP_ATTRS = {"class", "id", "data-name"}
 
+# Attribute keys as the parser reports them: bare, or qualified with the SVG
+# namespace. fill is stripped too; style is cleaned rather than dropped.
+STRIP_ATTR_KEYS = frozenset(
+    STRIP_ATTRS | {"fill"} | {f"{{{SVG_NS}}}{a}" for a in STRIP_ATTRS | {"fill"}}
+)
+STYLE_ATTR_KEYS = frozenset({"style", f"{{{SVG_NS}}}style"})
+
+# Prefixed namespace declarations on a serialized start tag
+XMLNS_PREFIX_RE = re.compile(r'\sxmlns:[\w.-]+="[^"]*"')
+
+# Any of these in the raw bytes means the SVG needs the full clean-up parse
+TRIVIAL_SVG_BLOCKERS = (
+    b"<defs", b"<style", b"<title", b"fill=", b"class=", b"id=",
+    b"data-name=", b"style=", b"xmlns:", b"<!",
+)
+
+# viewBox attribute within the raw root start tag
+VIEWBOX_BYTES_RE = re.compile(rb'viewBox\s*=\s*"([^"]+)"')
+
+# Files smaller than this cannot hold an <svg viewBox="..."> with content
+MIN_SVG_BYTES = 32
+
+# Glyph minification: whitespace between tags, path/points attribute
+# values, and the numbers inside them
+INTER_TAG_WS_RE = re.compile(r">\s+<")
+PATH_DATA_ATTR_RE = re.compile(r'(\s(?:d|points)=")([^"]*)(")')
+PATH_NUMBER_RE = re.compile(r"(?:\d+\.\d*|\.\d+|\d+)(?:[eE][-+]?\d+)?")
+# Elliptical arc segments: from an A/a command up to the next command.
+# Their two flags are single characters that may be written without
+# separators ("0 0110.5"), so arc arguments are read one at a time.
+PATH_ARC_SEGMENT_RE = re.compile(r"[Aa][^MmZzLlHhVvCcSsQqTtAa]*")
+ARC_NUMBER_ARG_RE = re.compile(r"([\s,]*[-+]?)((?:\d+\.\d*|\.\d+|\d+)(?:[eE][-+]?\d+)?)")
+ARC_FLAG_ARG_RE = re.compile(r"([\s,]*)([01])")
+ARC_FLAG_ARGS = (3, 4)  # large-arc and sweep, of the 7 arguments per arc
+COORD_DECIMALS = 3
+
+# fill declarations inside an inline style="" attribute
+STYLE_FILL_RE = re.compile(r"fill\s*:\s*[^;]+;?")
+
+
+def xml_backend() -> str:
+    """Describe the XML implementation used for SVG parsing."""
+    if HAVE_LXML:
+        return f"lxml {ET.__version__}"
+    try:
+        import _elementtree
+    except ImportError:
+        return "xml.etree (pure Python)"
+    if ET.Element is _elementtree.Element:
+        return "xml.etree (C accelerator)"
+    return "xml.etree (pure Python)"
+
 
-def clean_svg_for_font(svg_text: str, glyph_id: int) -> str | None:
+def fit_transform(viewbox: str) -> str | None:
     """
-    Parse an SVG file, strip styles/defs/fills, and return an <svg> document
-    suitable for embedding in an SVG-in-OpenType font table.
-
-    The glyph SVG must:
-      - Use id="glyph{glyph_id}" on the root <svg>
-      - Be scaled to fit the UPM grid (1000 units tall)
-      - Have no fill attributes (inherits currentColor)
+    Return the transform that scales and centres content with the given
+    viewBox inside the UPM em-square, or None if the viewBox is unusable.
     """
-    try:
-        root = ET.fromstring(svg_text)
-    except ET.ParseError as exc:
-        print(f"  WARNING: SVG parse error: {exc}")
-        return None
-
-    # ---- Extract viewBox dimensions ----
-    vb = root.get("viewBox", "")
-    parts = vb.split()
+    parts = viewbox.split()
     if len(parts) != 4:
-        print(f"  WARNING: bad viewBox '{vb}'")
+        print(f"  WARNING: bad viewBox '{viewbox}'")
         return None
     vb_x, vb_y, vb_w, vb_h = (float(p) for p in parts)
 
     if vb_w <= 0 or vb_h <= 0:
         return None
 
-    # ---- Compute scaling ----
     # We want the SVG to fit in (UPM x UPM), preserving aspect ratio.
     # The font's em-square is UPM tall (ascent + |descent| = 1000).
     # We scale so the taller dimension fits in UPM.
@@ -97,59 +178,336 @@ def clean_svg_for_font(svg_text: str, glyph_id: int) -> str | None:
     # Center vertically in UPM
     offset_y = (UPM - new_h) / 2.0
 
-    # ---- Strip unwanted elements recursively ----
-    def strip_recursive(elem):
-        to_remove = []
-        for child in elem:
-            if child.tag in STRIP_ELEMENTS:
-                to_remove.append(child)
-            else:
-                strip_recursive(child)
-        for child in to_remove:
-            elem.remove(child)
-
-    strip_recursive(root)
-
-    # ---- Strip unwanted attributes and fills ----
-    def clean_attrs(elem):
-        for attr in list(elem.attrib):
-            local = attr.split("}")[-1] if "}" in attr else attr
-            if local in STRIP_ATTRS:
-                del elem.attrib[attr]
-            elif local == "fill":
-                del elem.attrib[attr]
-            elif local == "style":
-                # Remove fill from inline style
-                style = elem.get("style", "")
-                style = re.sub(r"fill\s*:\s*[^;]+;?", "", style).strip()
-                if style:
-                    elem.set("style", style)
-                else:
-                    del elem.attrib["style"]
-        for child in elem:
-            clean_attrs(child)
-
-    clean_attrs(root)
-
-    # ---- Build the glyph SVG document ----
-    # The SVG table requires each document to have id="glyphNN"
-    # where NN is the glyph index.
-    # We wrap the icon content in a transform group to scale/position it.
-    inner_parts = []
-    for child in root:
-        inner_parts.append(ET.tostring(child, encoding="unicode"))
-    inner_svg = "".join(inner_parts)
+    return f"translate({offset_x:.4f},{offset_y:.4f}) scale({scale:.6f})"
+
+
+def raw_viewbox(svg_bytes: bytes) -> str | None:
+    """
+    Return the viewBox read straight from the root start tag, or None when
+    it is not there in plain form (the full parse then decides).
+    """
+    svg_start = svg_bytes.find(b"<svg")
+    if svg_start < 0:
+        return None
+    start_tag_end = svg_bytes.find(b">", svg_start)
+    match = VIEWBOX_BYTES_RE.search(svg_bytes, svg_start, start_tag_end)
+    if match is None or b"&" in match.group(1):
+        return None
+    try:
+        return match.group(1).decode("utf-8")
+    except UnicodeDecodeError:
+        return None
+
+
+def split_trivial_svg(svg_bytes: bytes) -> str | None:
+    """
+    Fast path for SVGs that need no cleaning at all: no defs/style/title
+    elements, no fill/class/id/style attributes, no comments, doctype,
+    processing instructions or extra namespaces. Returns the content sliced
+    straight from the bytes, or None to take the full parse.
+    """
+    if any(token in svg_bytes for token in TRIVIAL_SVG_BLOCKERS):
+        return None
+    svg_start = svg_bytes.find(b"<svg")
+    start_tag_end = svg_bytes.find(b">", svg_start) + 1
+    svg_end = svg_bytes.rfind(b"</svg>")
+    if svg_start < 0 or start_tag_end <= 0 or svg_end < start_tag_end:
+        return None
+    if b"<?" in svg_bytes[svg_start:]:
+        return None
+    try:
+        return svg_bytes[start_tag_end:svg_end].decode("utf-8")
+    except UnicodeDecodeError:
+        return None
+
+
+def round_path_number(token: str) -> str:
+    """Round one path-data number to COORD_DECIMALS places, dropping a leading 0."""
+    dot = token.find(".")
+    if dot < 0 or "e" in token or "E" in token:
+        return token
+    if len(token) - dot - 1 > COORD_DECIMALS:
+        token = f"{float(token):.{COORD_DECIMALS}f}".rstrip("0").rstrip(".") or "0"
+    return token[1:] if token.startswith("0.") else token
+
+
+def round_path_numbers(data: str) -> str:
+    """Round every number in a run of path data with no arc segments."""
+    parts = []
+    pos = 0
+    prev = ""
+    for num in PATH_NUMBER_RE.finditer(data):
+        sep = data[pos:num.start()]
+        token = round_path_number(num.group(0))
+        # Adjacent numbers (".5.25") rely on the second dot as separator;
+        # keep them apart if rounding removed a dot ("1" then ".25").
+        if not sep and prev and (token[0] != "." or not ("." in prev or "e" in prev or "E" in prev)):
+            sep = " "
+        parts.append(sep)
+        parts.append(token)
+        prev = token
+        pos = num.end()
+    parts.append(data[pos:])
+    return "".join(parts)
+
+
+def round_arc_segment(segment: str) -> str:
+    """
+    Round the numbers in one arc segment ("a" and its arguments), keeping
+    each arc's large-arc and sweep flags as single characters. A segment
+    that does not parse as whole arcs is returned unchanged.
+    """
+    parts = [segment[0]]
+    pos = 1
+    prev = ""
+    prev_is_flag = False
+    index = 0
+    while True:
+        is_flag = index % 7 in ARC_FLAG_ARGS
+        arg = (ARC_FLAG_ARG_RE if is_flag else ARC_NUMBER_ARG_RE).match(segment, pos)
+        if arg is None:
+            break
+        sep, token = arg.groups()
+        if not is_flag:
+            token = round_path_number(token)
+        # Same rule as round_path_numbers, except that anything may follow
+        # a flag directly
+        if (not sep and prev and not prev_is_flag
+                and (token[0] != "." or not ("." in prev or "e" in prev or "E" in prev))):
+            sep = " "
+        parts.append(sep)
+        parts.append(token)
+        prev = token
+        prev_is_flag = is_flag
+        pos = arg.end()
+        index += 1
+    if index % 7 or segment[pos:].strip(" \t\r\n,"):
+        return segment
+    parts.append(segment[pos:])
+    return "".join(parts)
+
+
+def round_path_data(match: re.Match) -> str:
+    """
+    Round the numbers inside one d="" / points="" attribute. Arc flags
+    written without separators stay flags:
+
+    >>> round_path_data(PATH_DATA_ATTR_RE.search(' d="M0.123456 2a5 5 0 0110.12345 3"'))
+    ' d="M.123 2a5 5 0 0110.123 3"'
+    """
+    data = match.group(2)
+    parts = []
+    pos = 0
+    for arc in PATH_ARC_SEGMENT_RE.finditer(data):
+        parts.append(round_path_numbers(data[pos:arc.start()]))
+        parts.append(round_arc_segment(arc.group(0)))
+        pos = arc.end()
+    parts.append(round_path_numbers(data[pos:]))
+    return match.group(1) + "".join(parts) + match.group(3)
+
+
+def minify_glyph_markup(markup: str) -> str:
+    """
+    Shrink glyph content before it goes into the SVG table: drop whitespace
+    between tags and round path coordinates to COORD_DECIMALS places (ample
+    once scaled to the 1000-unit em). Smaller input also compresses better
+    in WOFF2.
+    """
+    markup = INTER_TAG_WS_RE.sub("><", markup)
+    return PATH_DATA_ATTR_RE.sub(round_path_data, markup)
+
+
+def clean_svg_for_font(svg_bytes: bytes) -> str | None:
+    """
+    Parse raw SVG file bytes, strip styles/defs/fills, and return the glyph
+    body: a <g transform="..."> group holding the icon content, ready to be
+    wrapped in an SVG-in-OpenType glyph document (see glyph_svg_doc).
+
+    Parsing from bytes lets the parser honour the file's own encoding
+    declaration without a decode/re-encode round trip. SVGs that are
+    already clean skip the parse entirely (see split_trivial_svg), and
+    empty files or degenerate viewBoxes are rejected before parsing.
 
-    # Build new SVG document string
+    The glyph body must:
+      - Be scaled to fit the UPM grid (1000 units tall)
+      - Have no fill attributes (inherits currentColor)
+    """
+    # ---- Cheap byte-level checks: skip the parse for unusable files ----
+    if len(svg_bytes) < MIN_SVG_BYTES:
+        print(f"  WARNING: SVG file empty or truncated ({len(svg_bytes)} bytes)")
+        return None
+    viewbox = raw_viewbox(svg_bytes)
+    transform = None
+    if viewbox is not None:
+        transform = fit_transform(viewbox)
+        if transform is None:
+            return None  # degenerate viewBox
+
+    inner_svg = split_trivial_svg(svg_bytes) if transform is not None else None
+    if inner_svg is not None:
+        ns_decls = ""
+    else:
+        try:
+            root = ET.fromstring(svg_bytes, XML_PARSER)
+        except ET.ParseError as exc:
+            print(f"  WARNING: SVG parse error: {exc}")
+            return None
+
+        # ---- Extract viewBox and compute scaling ----
+        if transform is None:
+            transform = fit_transform(root.get("viewBox", ""))
+            if transform is None:
+                return None
+
+        # ---- Strip unwanted attributes, fills and elements (single pass) ----
+        # Elements are collected during the walk and detached afterwards; this
+        # works with both lxml and xml.etree, which has no getparent().
+        doomed = []
+        for elem in root.iter():
+            attrs = elem.attrib
+            for attr in list(attrs):
+                if attr in STRIP_ATTR_KEYS:
+                    del attrs[attr]
+                elif attr in STYLE_ATTR_KEYS:
+                    # Remove fill from inline style
+                    style = STYLE_FILL_RE.sub("", attrs[attr]).strip()
+                    if style:
+                        attrs[attr] = style
+                    else:
+                        del attrs[attr]
+                elif attr[0] == "{" and attr.rpartition("}")[2] in STRIP_ATTR_KEYS:
+                    # Same attribute under another namespace (e.g. xml:id)
+                    del attrs[attr]
+            for child in elem:
+                if child.tag in STRIP_ELEMENTS:
+                    doomed.append((elem, child))
+
+        for parent, child in doomed:
+            parent.remove(child)
+
+        # Drop namespace declarations (e.g. xlink) left unused after stripping
+        if HAVE_LXML:
+            ET.cleanup_namespaces(root)
+
+        # Serialize the cleaned root once and slice out its content. Attribute
+        # values are escaped on output, so the first ">" closes the start tag.
+        body = ET.tostring(root, encoding="unicode")
+        start_tag_end = body.find(">") + 1
+        if body[start_tag_end - 2] == "/":
+            inner_svg = ""  # self-closing <svg/>
+        else:
+            inner_svg = body[start_tag_end:body.rfind("</")]
+        # Prefixed namespaces (e.g. xlink) declared on the root must move to
+        # the wrapping group so the content stays well-formed.
+        ns_decls = "".join(XMLNS_PREFIX_RE.findall(body, 0, start_tag_end))
+
+    # ---- Build the glyph body ----
+    # We wrap the icon content in a transform group to scale/position it.
     # The SVG-in-OpenType spec: the SVG doc viewBox maps to the em-square.
     # We set viewBox to 0 0 UPM UPM and transform the content.
-    svg_doc = (
-        f'<svg xmlns="http://www.w3.org/2000/svg" id="glyph{glyph_id}">'
-        f'<g transform="translate({offset_x:.4f},{offset_y:.4f}) scale({scale:.6f})">'
-        f"{inner_svg}"
-        f"</g></svg>"
-    )
-    return svg_doc
+    return f'<g{ns_decls} transform="{transform}">{minify_glyph_markup(inner_svg)}</g>'
+
+
+def glyph_svg_doc(svg_body: str, glyph_index: int) -> str:
+    """
+    Wrap a cleaned glyph body in its SVG document. The SVG table requires
+    each document to have id="glyphNN" where NN is the glyph index, which
+    is only known once icons are sorted by codepoint.
+    """
+    return f'<svg xmlns="http://www.w3.org/2000/svg" id="glyph{glyph_index}">{svg_body}</svg>'
+
+
+def read_svg_bytes(svg_path: str) -> bytes:
+    """Read a whole SVG file with raw os.read calls; runs in a reader thread."""
+    fd = os.open(svg_path, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+    try:
+        chunks = []
+        while chunk := os.read(fd, READ_CHUNK_SIZE):
+            chunks.append(chunk)
+    finally:
+        os.close(fd)
+    return b"".join(chunks)
+
+
+def write_output(path: str, data: bytes) -> int:
+    """
+    Write a finished output file with raw os.write calls, reserving its
+    full size up front where the platform supports posix_fallocate.
+    Returns the number of bytes written.
+    """
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0), 0o644)
+    try:
+        if data and hasattr(os, "posix_fallocate"):
+            try:
+                os.posix_fallocate(fd, 0, len(data))
+            except OSError:
+                pass  # filesystem without fallocate support; just write
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+    return len(data)
+
+
+def process_one(svg_bytes: bytes) -> str | None:
+    """Clean one icon SVG into its glyph body; runs in a worker process."""
+    return clean_svg_for_font(svg_bytes)
+
+
+# ---------------------------------------------------------------------------
+# Cleaned-SVG cache
+# ---------------------------------------------------------------------------
+
+def svg_cache_salt() -> bytes:
+    """
+    Everything besides the SVG bytes that affects clean_svg_for_font output:
+    the em size, the XML backend and this script's own source. Editing the
+    script therefore invalidates the cache automatically.
+    """
+    with open(os.path.abspath(__file__), "rb") as f:
+        source_digest = hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+    return f"{UPM}|{xml_backend()}|{source_digest}".encode()
+
+
+def cached_clean_path(svg_bytes: bytes, salt: bytes) -> str:
+    """Return the cache file path for a source SVG."""
+    key = hashlib.blake2b(svg_bytes + salt, digest_size=16).hexdigest()
+    return os.path.join(SVG_CACHE_DIR, f"{key}.svg")
+
+
+def read_cached_clean(cache_path: str) -> str | None:
+    """Return a cached glyph body, or None on a miss."""
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+def write_cached_clean(cache_path: str, svg_body: str) -> None:
+    """Store a glyph body (via temp file, so entries are never partial)."""
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(svg_body)
+    os.replace(tmp_path, cache_path)
+
+
+def prune_svg_cache(used_paths: set[str]) -> int:
+    """
+    Delete cache entries not used in this run (left over from edited SVGs
+    or an earlier version of this script) and return how many were removed.
+    """
+    removed = 0
+    with os.scandir(SVG_CACHE_DIR) as entries:
+        for entry in entries:
+            if entry.is_file() and entry.path not in used_paths:
+                try:
+                    os.remove(entry.path)
+                    removed += 1
+                except FileNotFoundError:
+                    pass
+    return removed
 
 
 # ---------------------------------------------------------------------------
@@ -158,7 +516,7 @@ def clean_svg_for_font(svg_text: str, glyph_id: int) -> str | None:
 
 def parse_codepoint(cp_str: str) -> int:
     """Parse 'U+E001' into integer 0xE001."""
-    return int(cp_str.replace("U+", "").replace("u+", ""), 16)
+    return int(cp_str[2:], 16) if cp_str[:2] in ("U+", "u+") else int(cp_str, 16)
 
 
 def build_font(icons_data: list[dict]) -> ttLib.TTFont:
@@ -171,34 +529,21 @@ def build_font(icons_data: list[dict]) -> ttLib.TTFont:
     # Sort by codepoint for consistency
     icons_data.sort(key=lambda d: d["codepoint"])
 
-    glyph_order = [".notdef"]
-    glyph_names = [".notdef"]
-    cmap = {}
-    svg_docs = []
-    advance_widths = {".notdef": UPM}
+    # Ensure unique glyph names (the only step that needs a running loop)
     glyph_name_set = set()
-
     for i, icon in enumerate(icons_data):
         gname = icon["glyph_name"]
-        # Ensure unique glyph names
         if gname in glyph_name_set:
-            gname = f"{gname}.{i}"
+            gname = icon["glyph_name"] = f"{gname}.{i}"
         glyph_name_set.add(gname)
-        icon["glyph_name"] = gname
-
-        glyph_order.append(gname)
-        glyph_names.append(gname)
-        cmap[icon["codepoint"]] = gname
-        advance_widths[gname] = UPM
-
-        glyph_index = i + 1  # .notdef is 0
-        svg_docs.append(
-            SVGDocument(
-                icon["svg_doc"],
-                startGlyphID=glyph_index,
-                endGlyphID=glyph_index,
-            )
-        )
+
+    glyph_order = [".notdef"] + [icon["glyph_name"] for icon in icons_data]
+    cmap = {icon["codepoint"]: icon["glyph_name"] for icon in icons_data}
+    # .notdef is glyph 0, so icon i is glyph i + 1
+    svg_docs = [
+        SVGDocument(icon["svg_doc"], startGlyphID=glyph_index, endGlyphID=glyph_index)
+        for glyph_index, icon in enumerate(icons_data, 1)
+    ]
 
     num_glyphs = len(glyph_order)
 
@@ -209,18 +554,13 @@ def build_font(icons_data: list[dict]) -> ttLib.TTFont:
     # Character map
     fb.setupCharacterMap(cmap)
 
-    # Draw empty glyph outlines (the actual rendering comes from SVG table).
-    # We need to use the pen API to create proper empty Glyph objects.
-    fb.setupGlyf({})
-    glyf_table = fb.font["glyf"]
-    from fontTools.ttLib.tables._g_l_y_f import Glyph
-    for gn in glyph_order:
-        glyf_table[gn] = Glyph()
+    # Empty glyph outlines (the actual rendering comes from the SVG table).
+    # An empty Glyph holds no outline data, so one instance serves them all.
+    empty_glyph = Glyph()
+    fb.setupGlyf(dict.fromkeys(glyph_order, empty_glyph))
 
     # Horizontal metrics — all glyphs get full UPM advance
-    metrics = {}
-    for gn in glyph_order:
-        metrics[gn] = (UPM, 0)  # (advance width, LSB)
+    metrics = dict.fromkeys(glyph_order, (UPM, 0))  # (advance width, LSB)
     fb.setupHorizontalMetrics(metrics)
 
     fb.setupHorizontalHeader(ascent=ASCENT, descent=DESCENT)
@@ -266,49 +606,30 @@ def build_font(icons_data: list[dict]) -> ttLib.TTFont:
 def generate_html(icons_data: list[dict], families: list[str]) -> str:
     """Generate an HTML reference page grouped by family."""
 
-    # Group icons by family
-    by_family: dict[str, list[dict]] = {f: [] for f in families}
+    # Group icons by family as precomputed row tuples:
+    #   (name_lower, cp_hex, char, name_html, name_lower_html)
+    # name_lower leads so rows sort alphabetically as plain tuples; ties fall
+    # back to cp_hex, i.e. codepoint order, as icons_data is already sorted.
+    by_family: dict[str, list[tuple[str, str, str, str, str]]] = {f: [] for f in families}
     for icon in icons_data:
-        fam = icon["family"]
-        if fam in by_family:
-            by_family[fam].append(icon)
-        else:
-            by_family[fam] = [icon]
+        name = icon["name"]
+        cp = icon["codepoint"]
+        name_lower = icon["name_lower"]
+        by_family.setdefault(icon["family"], []).append((
+            name_lower,
+            f"U+{cp:04X}",
+            chr(cp),
+            html.escape(name),
+            html.escape(name_lower),
+        ))
 
     # Sort each family alphabetically by name
-    for fam in by_family:
-        by_family[fam].sort(key=lambda d: d["name"].lower())
-
-    # Build icon grid HTML
-    grid_sections = []
-    for fam in families:
-        fam_icons = by_family.get(fam, [])
-        if not fam_icons:
-            continue
-        cards = []
-        for icon in fam_icons:
-            cp_hex = f"U+{icon['codepoint']:04X}"
-            char = chr(icon["codepoint"])
-            cards.append(
-                f'      <div class="icon-card" data-name="{icon["name"].lower()}" data-family="{fam.lower()}">\n'
-                f'        <div class="icon-char" title="Click to copy">{char}</div>\n'
-                f'        <div class="icon-name">{icon["name"]}</div>\n'
-                f'        <div class="icon-code">{cp_hex}</div>\n'
-                f"      </div>"
-            )
-        section = (
-            f'    <div class="family-section">\n'
-            f'      <h2 class="family-header">{fam}</h2>\n'
-            f'      <div class="icon-grid">\n'
-            + "\n".join(cards) + "\n"
-            f"      </div>\n"
-            f"    </div>"
-        )
-        grid_sections.append(section)
+    for rows in by_family.values():
+        rows.sort()
 
     total = len(icons_data)
 
-    html = f"""<!DOCTYPE html>
+    html_head = f"""<!DOCTYPE html>
 <html lang="en">
 <head>
 <meta charset="UTF-8">
@@ -486,7 +807,30 @@ footer {{
 </div>
 
 <div class="container" id="iconContainer">
-{"".join(grid_sections)}
+"""
+
+    # The page is assembled as a flat list of fragments joined once at the
+    # end, rather than nesting per-card and per-section joins.
+    out = [html_head]
+    append = out.append
+    for fam in families:
+        fam_icons = by_family.get(fam, [])
+        if not fam_icons:
+            continue
+        fam_lower = html.escape(fam.lower())
+        append('    <div class="family-section">\n')
+        append(f'      <h2 class="family-header">{html.escape(fam)}</h2>\n')
+        append('      <div class="icon-grid">\n')
+        for _, cp_hex, char, name_html, name_lower_html in fam_icons:
+            append(f'      <div class="icon-card" data-name="{name_lower_html}" data-family="{fam_lower}">\n')
+            append(f'        <div class="icon-char" title="Click to copy">{char}</div>\n')
+            append(f'        <div class="icon-name">{name_html}</div>\n')
+            append(f'        <div class="icon-code">{cp_hex}</div>\n')
+            append("      </div>\n")
+        append("      </div>\n")
+        append("    </div>")
+
+    append(f"""
 </div>
 
 <div class="no-results" id="noResults">No icons match your search.</div>
@@ -526,16 +870,72 @@ footer {{
 </script>
 
 </body>
-</html>"""
+</html>""")
+
+    return "".join(out)
+
+
+class BrotliWithQuality:
+    """
+    Stand-in for the brotli module inside fontTools.ttLib.woff2. fontTools
+    calls brotli.compress() without a quality argument, so this wrapper
+    supplies one and forwards everything else to the real module.
+    """
+
+    def __init__(self, brotli_module, quality: int):
+        self._brotli = brotli_module
+        self._quality = quality
 
-    return html
+    def compress(self, data, **kwargs):
+        kwargs.setdefault("quality", self._quality)
+        return self._brotli.compress(data, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._brotli, name)
+
+
+def woff2_bytes(font: ttLib.TTFont, quality: int) -> bytes:
+    """Compile font as WOFF2 with the given Brotli quality."""
+    brotli_module = getattr(woff2, "brotli", None)
+    if brotli_module is None:
+        raise ImportError("WOFF2 output needs the brotli module (pip install brotli)")
+    woff2.brotli = BrotliWithQuality(brotli_module, quality)
+    buf = io.BytesIO()
+    try:
+        font.flavor = "woff2"
+        font.save(buf)
+    finally:
+        woff2.brotli = brotli_module
+    return buf.getvalue()
 
 
 # ---------------------------------------------------------------------------
 # Main
 # ---------------------------------------------------------------------------
 
-def main():
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Generate the OCHA humanitarian icon font.")
+    parser.add_argument(
+        "--woff2-only",
+        action="store_true",
+        help="write only the WOFF2 font (the HTML page's first choice) and "
+             "leave any existing TTF untouched",
+    )
+    parser.add_argument(
+        "--woff2-quality",
+        type=int,
+        choices=range(12),
+        default=WOFF2_QUALITY,
+        metavar="N",
+        help=f"Brotli quality 0-11 for the WOFF2 (default {WOFF2_QUALITY}; "
+             "lower is faster, larger)",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None):
+    args = parse_args(argv)
+
     print(f"OCHA Humanitarian Icons — Font Generator")
     print(f"{'=' * 50}")
 
@@ -550,6 +950,7 @@ def main():
     families = metadata.get("families", [])
     icons_meta = metadata.get("icons", {})
     print(f"Loaded {len(icons_meta)} icons from metadata.json")
+    print(f"SVG parser: {xml_backend()}")
 
     # ---- Validate codepoints ----
     missing_codepoint = []
@@ -568,6 +969,12 @@ def main():
     icons_data = []
     failed = []
     codepoint_map = {}  # check for duplicate codepoints
+    pending = []        # icons with an SVG on disk, in slug order
+    svg_paths = []
+    misses = []         # (icon, cache_path, future) being cleaned
+    used_cache_paths = set()
+    cache_salt = svg_cache_salt()
+    os.makedirs(SVG_CACHE_DIR, exist_ok=True)
 
     for slug, info in sorted(icons_meta.items()):
         cp_str = info["font_codepoint"]
@@ -586,37 +993,55 @@ def main():
             failed.append((slug, "SVG file not found"))
             continue
 
-        with open(svg_path, "r", encoding="utf-8") as f:
-            svg_text = f.read()
-
-        # glyph index: will be determined after sorting
-        # Use a placeholder; we'll fix after sorting
-        svg_doc = clean_svg_for_font(svg_text, glyph_id=0)
-        if svg_doc is None:
-            print(f"  SKIP: SVG processing failed for '{slug}'")
-            failed.append((slug, "SVG processing error"))
-            continue
-
         # Make a safe glyph name (PostScript-compatible)
         glyph_name = f"uni{cp_int:04X}"
 
-        icons_data.append({
+        pending.append({
             "slug": slug,
             "name": name,
+            "name_lower": name.lower(),  # HTML sort key and search attribute
             "family": family,
             "codepoint": cp_int,
             "glyph_name": glyph_name,
-            "svg_doc": svg_doc,
         })
+        svg_paths.append(svg_path)
+
+    # Reader threads prefetch the SVG bytes while the process pool cleans
+    # the cache misses (CPU-bound, independent per icon), so file I/O
+    # overlaps with parsing. Process workers only start on the first miss.
+    # Font assembly below stays single-process.
+    with ThreadPoolExecutor(max_workers=READER_THREADS) as readers, \
+            ProcessPoolExecutor() as cleaners:
+        for icon, svg_bytes in zip(pending, readers.map(read_svg_bytes, svg_paths)):
+            cache_path = cached_clean_path(svg_bytes, cache_salt)
+            used_cache_paths.add(cache_path)
+            svg_body = read_cached_clean(cache_path)
+            if svg_body is not None:
+                icon["svg_body"] = svg_body
+            else:
+                misses.append((icon, cache_path, cleaners.submit(process_one, svg_bytes)))
+
+        for icon, cache_path, future in misses:
+            svg_body = future.result()
+            icon["svg_body"] = svg_body
+            if svg_body is not None:
+                write_cached_clean(cache_path, svg_body)
+    pruned = prune_svg_cache(used_cache_paths)
+    print(f"SVG cache: {len(pending) - len(misses)} hit(s), {len(misses)} cleaned, "
+          f"{pruned} pruned")
+
+    for icon in pending:
+        if icon["svg_body"] is None:
+            print(f"  SKIP: SVG processing failed for '{icon['slug']}'")
+            failed.append((icon["slug"], "SVG processing error"))
+            continue
+        icons_data.append(icon)
 
-    # Sort by codepoint and fix glyph IDs in SVG docs
+    # Sort by codepoint, then wrap each body in its glyph document now that
+    # the glyph index is known (.notdef is glyph 0)
     icons_data.sort(key=lambda d: d["codepoint"])
-    for i, icon in enumerate(icons_data):
-        glyph_index = i + 1  # .notdef is glyph 0
-        # Update the SVG doc id to match glyph index
-        icon["svg_doc"] = icon["svg_doc"].replace(
-            'id="glyph0"', f'id="glyph{glyph_index}"'
-        )
+    for glyph_index, icon in enumerate(icons_data, start=1):
+        icon["svg_doc"] = glyph_svg_doc(icon.pop("svg_body"), glyph_index)
 
     print(f"\nProcessed {len(icons_data)} icons successfully")
     if failed:
@@ -635,25 +1060,31 @@ def main():
     # ---- Save outputs ----
     os.makedirs(OUTPUT_DIR, exist_ok=True)
 
-    # Save TTF
-    font.save(TTF_PATH)
-    ttf_size = os.path.getsize(TTF_PATH)
-    print(f"  TTF: {TTF_PATH}")
-    print(f"       {ttf_size:,} bytes ({ttf_size / 1024:.1f} KB)")
+    if args.woff2_only:
+        ttf_size = None
+        woff2_font = font
+    else:
+        # Save TTF: serialize the tables once, in memory
+        buf = io.BytesIO()
+        font.save(buf)
+        ttf_bytes = buf.getvalue()
+        ttf_size = write_output(TTF_PATH, ttf_bytes)
+        print(f"  TTF: {TTF_PATH}")
+        print(f"       {ttf_size:,} bytes ({ttf_size / 1024:.1f} KB)")
+
+        # Re-open the compiled TTF for WOFF2 so its tables are copied as
+        # already-compiled data instead of being rebuilt from the builder
+        woff2_font = ttLib.TTFont(io.BytesIO(ttf_bytes))
 
     # Save WOFF2
-    font.flavor = "woff2"
-    font.save(WOFF2_PATH)
-    woff2_size = os.path.getsize(WOFF2_PATH)
+    woff2_size = write_output(WOFF2_PATH, woff2_bytes(woff2_font, args.woff2_quality))
     print(f"  WOFF2: {WOFF2_PATH}")
     print(f"         {woff2_size:,} bytes ({woff2_size / 1024:.1f} KB)")
 
     # ---- Generate HTML ----
     print(f"\nGenerating HTML reference page...")
-    html = generate_html(icons_data, families)
-    with open(HTML_PATH, "w", encoding="utf-8") as f:
-        f.write(html)
-    html_size = os.path.getsize(HTML_PATH)
+    html_page = generate_html(icons_data, families)
+    html_size = write_output(HTML_PATH, html_page.encode("utf-8"))
     print(f"  HTML: {HTML_PATH}")
     print(f"        {html_size:,} bytes ({html_size / 1024:.1f} KB)")
 
@@ -662,7 +1093,8 @@ def main():
     print(f"DONE")
     print(f"  Total glyphs: {len(icons_data)} (+ .notdef)")
     print(f"  Codepoint range: U+{icons_data[0]['codepoint']:04X} - U+{icons_data[-1]['codepoint']:04X}")
-    print(f"  TTF size:   {ttf_size / 1024:.1f} KB")
+    if ttf_size is not None:
+        print(f"  TTF size:   {ttf_size / 1024:.1f} KB")
     print(f"  WOFF2 size: {woff2_size / 1024:.1f} KB")
     if failed:
         print(f"  Failed icons: {len(failed)}")
@@ -7,14 +7,40 @@ with all icons organized by family. Every icon's vector paths are embedded
 directly (no <image>, <use>, or external references) so the output opens in
 Adobe Illustrator with fully editable paths.
 
-No external dependencies — pure Python standard library.
+Usage:
+    python scripts/generate-grid.py [--svgz] [--reusable]
+
+--svgz also writes a gzip-compressed copy (.svgz) next to the SVG.
+--reusable defines each icon once as a <symbol> and places it with <use>.
+This only makes the file smaller when an icon is placed more than once;
+with every icon placed once (as today) the output is larger. It is also
+not the flat, editable Illustrator layout, so it is never the default.
+
+No external dependencies — pure Python standard library. If lxml is
+installed, icons are cleaned in a single parse instead of the regex passes.
+Cleaned icons are cached in output/.icons.cache.pkl, so unchanged files are
+not parsed again on the next run.
 """
 
+import argparse
+import functools
+import gzip
+import hashlib
+import io
 import json
 import math
 import os
+import pickle
 import re
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+try:
+    from lxml import etree
+    HAVE_LXML = True
+except ImportError:
+    HAVE_LXML = False
 
 # ---------------------------------------------------------------------------
 # Configuration
@@ -31,11 +57,63 @@ LABEL_COLOR = "#4a4a4a"
 HEADER_BG = "#f0f0f0"
 HEADER_TEXT_COLOR = "#333333"
 PAGE_MARGIN = 20
+OUTPUT_BUFFER_SIZE = 1 << 20  # write buffer for the grid SVG
+SVGZ_COMPRESS_LEVEL = 1       # gzip level for --svgz (fast; 9 is smallest)
 
 # Derived
 GRID_WIDTH = COLS * CELL_WIDTH
 TOTAL_WIDTH = GRID_WIDTH + 2 * PAGE_MARGIN
 
+# Family header pieces with the constant geometry and styling filled in;
+# only the y position, family name and icon count vary (%-formatted)
+FAMILY_HEADER_RECT = (
+    f'<rect x="{PAGE_MARGIN}" y="%s" '
+    f'width="{GRID_WIDTH}" height="{HEADER_HEIGHT}" '
+    f'fill="{HEADER_BG}" rx="3" ry="3"/>'
+)
+FAMILY_HEADER_TEXT = (
+    f'<text x="{PAGE_MARGIN + 10}" y="%s" '
+    f'font-family="{FONT}" font-size="14" font-weight="bold" '
+    f'fill="{HEADER_TEXT_COLOR}" '
+    f'dominant-baseline="central">'
+    f'%s</text>'
+)
+FAMILY_COUNT_TEXT = (
+    f'<text x="{PAGE_MARGIN + GRID_WIDTH - 10}" y="%s" '
+    f'font-family="{FONT}" font-size="10" '
+    f'fill="{LABEL_COLOR}" '
+    f'dominant-baseline="central" text-anchor="end">'
+    f'%s icons</text>'
+)
+
+# One grid cell: the icon group and its label, with the constant styling
+# baked in (lines match the newline-joined output parts)
+LABEL_TEMPLATE = (
+    '<text x="{lx}" y="{ly}" '
+    f'font-family="{FONT}" font-size="8" '
+    f'fill="{LABEL_COLOR}" '
+    'text-anchor="middle">'
+    '{name}</text>'
+)
+# Icon scale factors are written to 4 decimals: at ICON_SIZE that is within
+# 0.003 px of the exact size, well below what a renderer can show
+ICON_TEMPLATE = (
+    '<g transform="translate({ix:.2f},{iy:.2f}) scale({sc:.4f})">\n'
+    '{inner}\n'
+    '</g>\n'
+    + LABEL_TEMPLATE
+)
+
+# --reusable: one <symbol> per icon, placed with <use> (href for SVG 2,
+# xlink:href for older consumers)
+SYMBOL_TEMPLATE = '<symbol id="{ref}" viewBox="0 0 {vw} {vh}">\n{inner}\n</symbol>'
+USE_TEMPLATE = (
+    '<use href="#{ref}" xlink:href="#{ref}" '
+    'x="{ix:.2f}" y="{iy:.2f}" width="{w:.2f}" height="{h:.2f}"/>\n'
+    + LABEL_TEMPLATE
+)
+SYMBOL_ID_INVALID_RE = re.compile(r'[^\w.-]')
+
 # ---------------------------------------------------------------------------
 # Paths (relative to repo root)
 # ---------------------------------------------------------------------------
@@ -46,6 +124,29 @@ SVG_DIR = os.path.join(REPO_ROOT, "svg")
 LOGO_PATH = os.path.join(REPO_ROOT, "assets", "OCHA_logo_horizontal_blue.svg")
 OUTPUT_DIR = os.path.join(REPO_ROOT, "output")
 OUTPUT_PATH = os.path.join(OUTPUT_DIR, "Humanitarian_icons_complete_library.svg")
+SVGZ_PATH = OUTPUT_PATH + "z"
+# Cleaned icon and logo bodies keyed by (path, mtime), see load_svg_cache
+SVG_CACHE_PATH = os.path.join(OUTPUT_DIR, ".icons.cache.pkl")
+
+
+# ---------------------------------------------------------------------------
+# Regular expressions (compiled once, shared by every icon)
+# ---------------------------------------------------------------------------
+VIEWBOX_RE = re.compile(r'viewBox\s*=\s*"([^"]+)"')
+# Group 1 is the stylesheet text (read for evenodd detection)
+STYLE_BLOCK_RE = re.compile(r'<style\b[^>]*>(.*?)</style>', re.DOTALL)
+# Every construct parse_svg_once has to act on, found in one scan
+SVG_TOKEN_RE = re.compile(r'<(?:(svg|style|defs|title)\b|!--|\?xml)')
+
+# Opening tags (self-closing or not) and their parts
+OPEN_TAG_RE = re.compile(r'<(\w+)(?:\s[^>]*)?\s*/?>')
+CLASS_ATTR_RE = re.compile(r'\s+class="[^"]*"')
+CLASS_VALUE_RE = re.compile(r'class="([^"]*)"')
+STYLE_ATTR_RE = re.compile(r'\s+style="[^"]*"')
+FILL_ATTR_RE = re.compile(r'\bfill\s*=')
+
+# CSS rules like .cls-1{...fill-rule:evenodd...}
+EVENODD_CLASS_RE = re.compile(r'\.([\w-]+)\s*\{[^}]*fill-rule\s*:\s*evenodd[^}]*\}')
 
 
 # ---------------------------------------------------------------------------
@@ -53,7 +154,7 @@ OUTPUT_PATH = os.path.join(OUTPUT_DIR, "Humanitarian_icons_complete_library.svg"
 # ---------------------------------------------------------------------------
 def parse_viewbox(svg_text):
     """Return (min_x, min_y, width, height) from the viewBox attribute."""
-    m = re.search(r'viewBox\s*=\s*"([^"]+)"', svg_text)
+    m = VIEWBOX_RE.search(svg_text)
     if not m:
         return (0, 0, 48, 48)
     parts = m.group(1).split()
@@ -63,36 +164,92 @@ def parse_viewbox(svg_text):
 # ---------------------------------------------------------------------------
 # SVG helper: extract inner content and clean it
 # ---------------------------------------------------------------------------
-def extract_svg_inner(svg_text):
+def parse_svg_once(svg_text):
     """
-    Extract the content inside the root <svg> element, stripping:
+    Read viewBox, stylesheet and root content in a single scan, stripping:
       - <?xml ...?> declarations
       - <!-- comments -->
       - <defs>...</defs> blocks
       - <style>...</style> blocks
       - <title>...</title> blocks
-    Returns the cleaned inner SVG markup string.
+    Returns:
+      ((min_x, min_y, width, height), style_text, cleaned_inner_svg)
+    where style_text is the body of the first <style> block (or "").
     """
-    # Remove XML declaration
-    text = re.sub(r'<\?xml[^?]*\?>', '', svg_text)
-    # Remove comments
-    text = re.sub(r'<!--.*?-->', '', text, flags=re.DOTALL)
-
-    # Extract content between <svg ...> and </svg>
-    m = re.search(r'<svg[^>]*>(.*)</svg>', text, re.DOTALL)
-    if not m:
-        return ""
-    inner = m.group(1)
-
-    # Strip <defs>...</defs>
-    inner = re.sub(r'<defs>.*?</defs>', '', inner, flags=re.DOTALL)
-    inner = re.sub(r'<defs\s[^>]*>.*?</defs>', '', inner, flags=re.DOTALL)
-    # Strip <style>...</style>
-    inner = re.sub(r'<style[^>]*>.*?</style>', '', inner, flags=re.DOTALL)
-    # Strip <title>...</title>
-    inner = re.sub(r'<title>.*?</title>', '', inner, flags=re.DOTALL)
+    style_text = None
+    root_end = -1           # index just past the root <svg ...> start tag
+    root_tag = ""
+    kept = []               # slices of the root content to keep
+    keep_from = -1
+    pos = 0
+    while True:
+        m = SVG_TOKEN_RE.search(svg_text, pos)
+        if not m:
+            break
+        start = m.start()
+        name = m.group(1)
+        if name is None:
+            # <!-- comment --> or <?xml ...?>: dropped wherever they are
+            close = '-->' if svg_text[start + 1] == '!' else '?>'
+            end = svg_text.find(close, m.end())
+            if end < 0:
+                break
+            end += len(close)
+        elif name == 'svg':
+            if root_end < 0:
+                end = svg_text.find('>', m.end())
+                if end < 0:
+                    break
+                root_tag = svg_text[start:end]
+                root_end = keep_from = end + 1
+            pos = m.end()
+            continue
+        elif name == 'style':
+            body_start = svg_text.find('>', m.end()) + 1
+            end = svg_text.find('</style>', body_start)
+            if body_start <= 0 or end < 0:
+                pos = m.end()
+                continue
+            if style_text is None:
+                style_text = svg_text[body_start:end]
+            end += len('</style>')
+        elif name == 'defs':
+            end = svg_text.find('</defs>', m.end())
+            if svg_text.find('>', m.end()) < 0 or end < 0:
+                pos = m.end()
+                continue
+            end += len('</defs>')
+            if style_text is None:
+                style_m = STYLE_BLOCK_RE.search(svg_text, start, end)
+                if style_m:
+                    style_text = style_m.group(1)
+        else:
+            # Only a bare <title> is stripped (one with attributes is kept)
+            end = svg_text.find('</title>', m.end())
+            if svg_text[m.end():m.end() + 1] != '>' or end < 0:
+                pos = m.end()
+                continue
+            end += len('</title>')
+        if root_end >= 0:
+            kept.append(svg_text[keep_from:start])
+            keep_from = end
+        pos = end
+
+    vb_m = VIEWBOX_RE.search(root_tag)
+    if vb_m:
+        parts = vb_m.group(1).split()
+        viewbox = (float(parts[0]), float(parts[1]), float(parts[2]), float(parts[3]))
+    else:
+        viewbox = parse_viewbox(svg_text)
 
-    return inner.strip()
+    inner = ""
+    if root_end >= 0:
+        kept.append(svg_text[keep_from:])
+        content = ''.join(kept)
+        svg_end = content.rfind('</svg>')
+        if svg_end >= 0:
+            inner = content[:svg_end].strip()
+    return (viewbox, style_text or "", inner)
 
 
 # ---------------------------------------------------------------------------
@@ -103,6 +260,11 @@ def extract_svg_inner(svg_text):
 SHAPE_ELEMENTS = {'path', 'circle', 'rect', 'polygon', 'ellipse', 'line', 'polyline'}
 
 
+def insert_attr(tag_text, elem_name, attr_text):
+    """Insert attr_text (with its leading space) right after the tag name."""
+    return '<' + elem_name + attr_text + tag_text[len(elem_name) + 1:]
+
+
 def clean_svg_content(inner_svg, fill_color=None):
     """
     Process extracted SVG inner content:
@@ -118,102 +280,237 @@ def clean_svg_content(inner_svg, fill_color=None):
     has_evenodd = 'fill-rule:evenodd' in inner_svg or 'fill-rule: evenodd' in inner_svg
 
     # Remove class attributes
-    result = re.sub(r'\s+class="[^"]*"', '', inner_svg)
+    result = CLASS_ATTR_RE.sub('', inner_svg)
 
     # Remove style attributes that just contain fill/stroke-width declarations
     # These come from the CSS classes and are not needed once we add direct fill
-    result = re.sub(r'\s+style="[^"]*"', '', result)
-
-    # For each shape element, ensure it has a direct fill attribute
-    def add_fill_to_element(match):
-        tag_text = match.group(0)
-        # Extract element name
-        elem_m = re.match(r'<(\w+)', tag_text)
-        if not elem_m:
-            return tag_text
-        elem_name = elem_m.group(1)
-
+    result = STYLE_ATTR_RE.sub('', result)
+
+    # For each shape element, ensure it has a direct fill attribute. Tags
+    # are rebuilt into a list of slices; unchanged tags stay inside the
+    # slice between patched ones.
+    fill_attr = ' fill="' + fill_color + '"'
+    out = []
+    pos = 0
+    for m in OPEN_TAG_RE.finditer(result):
+        elem_name = m.group(1)
         if elem_name not in SHAPE_ELEMENTS:
-            return tag_text
-
+            continue
+        tag_text = m.group(0)
         # Skip if already has explicit fill attribute
-        if re.search(r'\bfill\s*=', tag_text):
-            return tag_text
-
+        if FILL_ATTR_RE.search(tag_text):
+            continue
         # Insert fill attribute after the element name
-        return tag_text.replace(
-            '<' + elem_name,
-            '<' + elem_name + ' fill="' + fill_color + '"',
-            1
-        )
+        out.append(result[pos:m.start()])
+        out.append(insert_attr(tag_text, elem_name, fill_attr))
+        pos = m.end()
+    out.append(result[pos:])
 
-    # Match opening tags (self-closing or not)
-    result = re.sub(r'<(\w+)(?:\s[^>]*)?\s*/?>', add_fill_to_element, result)
+    return ''.join(out)
 
-    return result
 
+def evenodd_classes_in(style_text):
+    """Return the CSS classes whose rules set fill-rule:evenodd."""
+    if not style_text or 'fill-rule' not in style_text:
+        return set()
+    # Match patterns like .cls-1{...fill-rule:evenodd...}
+    return {m.group(1) for m in EVENODD_CLASS_RE.finditer(style_text)}
 
-def clean_svg_content_with_evenodd(inner_svg, style_text, fill_color=None):
+
+def clean_svg_content_with_evenodd(inner_svg, evenodd_classes, fill_color=None):
     """
-    Enhanced version that also handles fill-rule:evenodd from CSS classes.
-    Parses the <style> to know which classes have evenodd, then applies
-    fill-rule="evenodd" as a direct attribute on those elements.
+    Enhanced version that also handles fill-rule:evenodd from CSS classes:
+    elements with one of evenodd_classes (see evenodd_classes_in) get
+    fill-rule="evenodd" as a direct attribute.
     """
     if fill_color is None:
         fill_color = ICON_COLOR
 
-    # Parse which CSS classes have fill-rule:evenodd
-    evenodd_classes = set()
-    if style_text:
-        # Match patterns like .cls-1{...fill-rule:evenodd...}
-        for m in re.finditer(r'\.([\w-]+)\s*\{[^}]*fill-rule\s*:\s*evenodd[^}]*\}', style_text):
-            evenodd_classes.add(m.group(1))
-
-    # Build a map: for each element, check if its class is in evenodd_classes
-    def process_element(match):
-        tag_text = match.group(0)
-        elem_m = re.match(r'<(\w+)', tag_text)
-        if not elem_m:
-            return tag_text
-        elem_name = elem_m.group(1)
-
-        # Check if this element's class is an evenodd class
+    # Rewrite every opening tag, assembling the result from slices
+    fill_attr = ' fill="' + fill_color + '"'
+    out = []
+    pos = 0
+    for m in OPEN_TAG_RE.finditer(inner_svg):
+        elem_name = m.group(1)
+        tag_text = m.group(0)
+
+        # Check if this element's class is an evenodd class, then remove
+        # the class/style attributes. The substring tests skip the regexes
+        # for the many tags that have neither.
         needs_evenodd = False
-        cls_m = re.search(r'class="([^"]*)"', tag_text)
-        if cls_m and evenodd_classes:
-            for cls in cls_m.group(1).split():
-                if cls in evenodd_classes:
-                    needs_evenodd = True
-                    break
+        if 'class="' in tag_text:
+            cls_m = CLASS_VALUE_RE.search(tag_text)
+            if cls_m and evenodd_classes:
+                needs_evenodd = not evenodd_classes.isdisjoint(cls_m.group(1).split())
+            tag_text = CLASS_ATTR_RE.sub('', tag_text)
+        if 'style="' in tag_text:
+            tag_text = STYLE_ATTR_RE.sub('', tag_text)
+
+        if elem_name in SHAPE_ELEMENTS:
+            # Add fill if not present
+            if not FILL_ATTR_RE.search(tag_text):
+                tag_text = insert_attr(tag_text, elem_name, fill_attr)
+            # Add fill-rule if needed
+            if needs_evenodd and 'fill-rule' not in tag_text:
+                tag_text = insert_attr(tag_text, elem_name, ' fill-rule="evenodd"')
+
+        out.append(inner_svg[pos:m.start()])
+        out.append(tag_text)
+        pos = m.end()
+    out.append(inner_svg[pos:])
+
+    return ''.join(out)
 
-        # Remove class attribute
-        tag_text = re.sub(r'\s+class="[^"]*"', '', tag_text)
-        # Remove style attribute
-        tag_text = re.sub(r'\s+style="[^"]*"', '', tag_text)
 
-        if elem_name not in SHAPE_ELEMENTS:
-            return tag_text
+# ---------------------------------------------------------------------------
+# SVG helper: single-pass tree clean-up (lxml)
+# ---------------------------------------------------------------------------
+SVG_NS = "http://www.w3.org/2000/svg"
+
+# Element tags as lxml reports them: SVG-namespaced, or bare for files that
+# omit the xmlns declaration
+STRIP_TAGS = frozenset(
+    [f"{{{SVG_NS}}}{t}" for t in ('defs', 'style', 'title')] + ['defs', 'style', 'title']
+)
+SHAPE_TAGS = frozenset([f"{{{SVG_NS}}}{t}" for t in SHAPE_ELEMENTS] + list(SHAPE_ELEMENTS))
+
+if HAVE_LXML:
+    # Comments, processing instructions and indentation never reach the grid
+    XML_PARSER = etree.XMLParser(
+        remove_blank_text=True,
+        remove_comments=True,
+        remove_pis=True,
+    )
 
-        # Add fill if not present
-        if not re.search(r'\bfill\s*=', tag_text):
-            tag_text = tag_text.replace(
-                '<' + elem_name,
-                '<' + elem_name + ' fill="' + fill_color + '"',
-                1
-            )
 
-        # Add fill-rule if needed
-        if needs_evenodd and 'fill-rule' not in tag_text:
-            tag_text = tag_text.replace(
-                '<' + elem_name,
-                '<' + elem_name + ' fill-rule="evenodd"',
-                1
-            )
+def clean_svg_tree(svg_text, fill_color):
+    """
+    lxml counterpart of parse_svg_once + clean_svg_content*: parse once,
+    drop defs/style/title, remove class/style attributes, give shapes a
+    direct fill (and fill-rule="evenodd" where their CSS class had it), and
+    serialize the root's content.
+    Returns (viewbox_w, viewbox_h, cleaned_inner_svg), or None if the file
+    is not well-formed XML.
+    """
+    try:
+        root = etree.fromstring(svg_text.encode('utf-8'), XML_PARSER)
+    except etree.XMLSyntaxError:
+        return None
 
-        return tag_text
+    viewbox = root.get('viewBox')
+    if viewbox:
+        parts = viewbox.split()
+        vb_w, vb_h = float(parts[2]), float(parts[3])
+    else:
+        vb_w, vb_h = 48.0, 48.0
+
+    # Which CSS classes have fill-rule:evenodd (first <style> only, as in
+    # the regex path)
+    style_el = next(root.iter(f"{{{SVG_NS}}}style", 'style'), None)
+    evenodd_classes = evenodd_classes_in(style_el.text if style_el is not None else None)
+
+    doomed = []
+    for el in root.iterdescendants():
+        tag = el.tag
+        if tag in STRIP_TAGS:
+            doomed.append(el)
+            continue
+        attrib = el.attrib
+        classes = attrib.pop('class', None)
+        attrib.pop('style', None)
+        if tag not in SHAPE_TAGS:
+            continue
+        if 'fill' not in attrib:
+            attrib['fill'] = fill_color
+        if evenodd_classes and classes and 'fill-rule' not in attrib:
+            if not evenodd_classes.isdisjoint(classes.split()):
+                attrib['fill-rule'] = 'evenodd'
+
+    for el in doomed:
+        parent = el.getparent()
+        if parent is not None:  # already gone with a stripped ancestor
+            parent.remove(el)
+
+    # Drop namespace declarations (e.g. xlink) left unused, then serialize
+    # the root once and slice out its content
+    etree.cleanup_namespaces(root)
+    body = etree.tostring(root, encoding='unicode')
+    start_tag_end = body.find('>') + 1
+    if body[start_tag_end - 2] == '/':
+        return (vb_w, vb_h, '')  # self-closing <svg/>
+    return (vb_w, vb_h, body[start_tag_end:body.rfind('</')].strip())
+
+
+def clean_svg_regex(svg_text, fill_color):
+    """
+    Regex clean-up used without lxml (and for files lxml cannot parse).
+    Returns (viewbox_w, viewbox_h, cleaned_inner_svg).
+    """
+    # viewBox, <style> content (for evenodd detection) and inner content
+    (_, _, vb_w, vb_h), style_text, inner = parse_svg_once(svg_text)
+    if not inner:
+        return (vb_w, vb_h, "")
 
-    result = re.sub(r'<(\w+)(?:\s[^>]*)?\s*/?>', process_element, inner_svg)
-    return result
+    # Clean: resolve classes to direct fill attributes. Only stylesheets
+    # with actual evenodd rules need the per-class path.
+    evenodd_classes = evenodd_classes_in(style_text)
+    if evenodd_classes:
+        cleaned = clean_svg_content_with_evenodd(inner, evenodd_classes, fill_color)
+    else:
+        cleaned = clean_svg_content(inner, fill_color)
+
+    return (vb_w, vb_h, cleaned)
+
+
+def clean_svg(svg_text, fill_color):
+    """Return (viewbox_w, viewbox_h, cleaned_inner_svg) for SVG source text."""
+    if HAVE_LXML:
+        result = clean_svg_tree(svg_text, fill_color)
+        if result is not None:
+            return result
+    return clean_svg_regex(svg_text, fill_color)
+
+
+# ---------------------------------------------------------------------------
+# Cleaned-SVG cache
+# ---------------------------------------------------------------------------
+def svg_cache_salt():
+    """
+    Everything besides the source files that affects the cleaned output:
+    the cleaning backend and this script's own source (which holds the
+    colours). Editing the script therefore invalidates the cache.
+    """
+    with open(os.path.abspath(__file__), 'rb') as f:
+        source_digest = hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+    backend = 'lxml' if HAVE_LXML else 'regex'
+    return f"{backend}|{source_digest}"
+
+
+def svg_cache_key(svg_path):
+    """Cache key for a source SVG: its path and modification time."""
+    return (svg_path, os.stat(svg_path).st_mtime_ns)
+
+
+def load_svg_cache(salt):
+    """
+    Return the cached {(path, mtime_ns): cleaned result} entries, or an
+    empty dict if there is no cache or it was written with another salt.
+    """
+    try:
+        with open(SVG_CACHE_PATH, 'rb') as f:
+            cached_salt, entries = pickle.load(f)
+    except (OSError, EOFError, ValueError, pickle.UnpicklingError):
+        return {}
+    return entries if cached_salt == salt else {}
+
+
+def save_svg_cache(salt, entries):
+    """Store the cache (via temp file, so it is never left partial)."""
+    os.makedirs(os.path.dirname(SVG_CACHE_PATH), exist_ok=True)
+    tmp_path = f"{SVG_CACHE_PATH}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        pickle.dump((salt, entries), f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, SVG_CACHE_PATH)
 
 
 # ---------------------------------------------------------------------------
@@ -227,52 +524,46 @@ def process_icon_svg(svg_path, fill_color=None):
     """
     if fill_color is None:
         fill_color = ICON_COLOR
+    return load_icon_svg(svg_path, fill_color)
 
-    with open(svg_path, 'r', encoding='utf-8') as f:
-        svg_text = f.read()
-
-    _, _, vb_w, vb_h = parse_viewbox(svg_text)
 
-    # Extract the <style> content before stripping (for evenodd detection)
-    style_m = re.search(r'<style[^>]*>(.*?)</style>', svg_text, re.DOTALL)
-    style_text = style_m.group(1) if style_m else ""
+@functools.lru_cache(maxsize=None)
+def load_icon_svg(svg_path, fill_color):
+    """
+    Cached body of process_icon_svg, keyed on (svg_path, fill_color) with
+    the fill already resolved, so each file is read and cleaned once per run
+    however many times it is placed.
+    """
+    svg_text = Path(svg_path).read_text(encoding='utf-8')
 
-    # Extract inner content
-    inner = extract_svg_inner(svg_text)
-    if not inner:
+    vb_w, vb_h, cleaned = clean_svg(svg_text, fill_color)
+    if not cleaned:
         return None
 
-    # Clean: resolve classes to direct fill attributes
-    if 'fill-rule' in style_text:
-        cleaned = clean_svg_content_with_evenodd(inner, style_text, fill_color)
-    else:
-        cleaned = clean_svg_content(inner, fill_color)
-
     return (vb_w, vb_h, cleaned)
 
 
 # ---------------------------------------------------------------------------
 # Process the OCHA logo SVG
 # ---------------------------------------------------------------------------
-def process_logo_svg(logo_path, target_height):
+def process_logo_svg(logo_path, target_height, cache=None):
     """
     Read the OCHA logo SVG and return:
       (rendered_width, rendered_height, svg_group_string)
-    The group is pre-scaled and ready to place.
+    The group is pre-scaled and ready to place. The cleaned logo is looked
+    up in (and added to) the optional svg cache dict.
     """
-    with open(logo_path, 'r', encoding='utf-8') as f:
-        svg_text = f.read()
-
-    _, _, vb_w, vb_h = parse_viewbox(svg_text)
-    inner = extract_svg_inner(svg_text)
-
-    # Clean class/style attributes from the logo too
-    style_m = re.search(r'<style[^>]*>(.*?)</style>', svg_text, re.DOTALL)
-    style_text = style_m.group(1) if style_m else ""
-    if 'fill-rule' in style_text:
-        cleaned = clean_svg_content_with_evenodd(inner, style_text, ICON_COLOR)
+    cache_key = svg_cache_key(logo_path)
+    if cache is not None and cache_key in cache:
+        vb_w, vb_h, cleaned = cache[cache_key]
     else:
-        cleaned = clean_svg_content(inner, ICON_COLOR)
+        with open(logo_path, 'r', encoding='utf-8') as f:
+            svg_text = f.read()
+
+        # Clean class/style attributes from the logo too
+        vb_w, vb_h, cleaned = clean_svg(svg_text, ICON_COLOR)
+        if cache is not None:
+            cache[cache_key] = (vb_w, vb_h, cleaned)
 
     scale = target_height / vb_h if vb_h > 0 else 1
     rendered_w = vb_w * scale
@@ -280,23 +571,87 @@ def process_logo_svg(logo_path, target_height):
     return (rendered_w, target_height, cleaned, vb_w, vb_h, scale)
 
 
+# ---------------------------------------------------------------------------
+# Icon placement
+# ---------------------------------------------------------------------------
+@functools.lru_cache(maxsize=None)
+def fit_icon(vb_w, vb_h):
+    """
+    Return (scale, offset_x, offset_y) for an icon with the given viewBox
+    size: the scale that fits it within ICON_SIZE x ICON_SIZE, and its
+    offsets from the cell's left edge and from the top of the icon area.
+    Depends only on the viewBox, so icons sharing one reuse the result.
+    """
+    if vb_w <= 0 or vb_h <= 0:
+        scale = 1.0
+    else:
+        scale = min(ICON_SIZE / vb_w, ICON_SIZE / vb_h)
+
+    rendered_w = vb_w * scale
+    rendered_h = vb_h * scale
+    return (scale, (CELL_WIDTH - rendered_w) / 2, (ICON_SIZE - rendered_h) / 2)
+
+
 # ---------------------------------------------------------------------------
 # XML/SVG escaping
 # ---------------------------------------------------------------------------
+XML_ESCAPE_TABLE = str.maketrans({
+    '&': '&amp;',
+    '<': '&lt;',
+    '>': '&gt;',
+    '"': '&quot;',
+    "'": '&apos;',
+})
+
+
 def xml_escape(text):
     """Escape text for use inside XML attributes or text nodes."""
-    return (text
-            .replace('&', '&amp;')
-            .replace('<', '&lt;')
-            .replace('>', '&gt;')
-            .replace('"', '&quot;')
-            .replace("'", '&apos;'))
+    return text.translate(XML_ESCAPE_TABLE)
+
+
+# ---------------------------------------------------------------------------
+# Output
+# ---------------------------------------------------------------------------
+def write_svg_parts(f, svg_parts):
+    """Write the output parts newline-separated, without joining them first."""
+    f.write(svg_parts[0])
+    for part in svg_parts[1:]:
+        f.write('\n')
+        f.write(part)
+
+
+def open_svgz(path):
+    """
+    Open path for writing gzip-compressed UTF-8 text. The gzip header's
+    timestamp is fixed so regenerating unchanged icons gives identical bytes.
+    """
+    raw = gzip.GzipFile(path, 'wb', compresslevel=SVGZ_COMPRESS_LEVEL, mtime=0)
+    return io.TextIOWrapper(raw, encoding='utf-8')
 
 
 # ---------------------------------------------------------------------------
 # Main generation
 # ---------------------------------------------------------------------------
-def main():
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate the OCHA humanitarian icon grid SVG.")
+    parser.add_argument(
+        "--svgz",
+        action="store_true",
+        help="also write a gzip-compressed copy (.svgz) of the grid",
+    )
+    parser.add_argument(
+        "--reusable",
+        action="store_true",
+        help="define each icon once as a <symbol> and place it with <use> "
+             "(smaller only when icons repeat, larger otherwise; not flat "
+             "paths for Illustrator)",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
     # Load metadata
     with open(METADATA_PATH, 'r', encoding='utf-8') as f:
         metadata = json.load(f)
@@ -352,8 +707,9 @@ def main():
     svg_parts = []
 
     # SVG root element
+    xlink_decl = ' xmlns:xlink="http://www.w3.org/1999/xlink"' if args.reusable else ''
     svg_parts.append(
-        f'<svg xmlns="http://www.w3.org/2000/svg" '
+        f'<svg xmlns="http://www.w3.org/2000/svg"{xlink_decl} '
         f'version="1.1" '
         f'width="{TOTAL_WIDTH}" height="{total_height}" '
         f'viewBox="0 0 {TOTAL_WIDTH} {total_height}">'
@@ -363,6 +719,16 @@ def main():
     svg_parts.append(
         f'<rect x="0" y="0" width="{TOTAL_WIDTH}" height="{total_height}" fill="#ffffff"/>'
     )
+    # --reusable: the <defs> of icon symbols goes here once they are known
+    defs_index = len(svg_parts)
+    symbols = {}
+    symbol_defs = []
+
+    # Cleaned logo and icons from earlier runs; only the entries used this
+    # run are written back, so edited or removed files drop out
+    cache_salt = svg_cache_salt()
+    svg_cache = load_svg_cache(cache_salt)
+    cached_keys = set(svg_cache)
 
     # -------------------------------------------------------------------
     # Header area: OCHA logo + title
@@ -372,7 +738,7 @@ def main():
 
     try:
         logo_rw, logo_rh, logo_inner, logo_vbw, logo_vbh, logo_scale = \
-            process_logo_svg(LOGO_PATH, LOGO_HEIGHT)
+            process_logo_svg(LOGO_PATH, LOGO_HEIGHT, svg_cache)
         svg_parts.append(
             f'<g transform="translate({logo_x},{logo_y}) scale({logo_scale:.6f})">'
         )
@@ -407,56 +773,71 @@ def main():
     icons_embedded = 0
     icons_failed = 0
 
+    # Read and clean every icon up front in worker processes (CPU-bound and
+    # independent per file); layout and emission below stay serial.
+    # One directory listing replaces a stat per icon.
+    svg_index = {
+        entry.name[:-4]: entry.path
+        for entry in os.scandir(SVG_DIR)
+        if entry.name.endswith('.svg') and entry.is_file()
+    }
+    icon_paths = [
+        svg_index[icon_key]
+        for fam_layout in family_layouts
+        for icon_key, _ in fam_layout['icons']
+        if icon_key in svg_index
+    ]
+    icon_keys = {svg_path: svg_cache_key(svg_path) for svg_path in icon_paths}
+    misses = [svg_path for svg_path, key in icon_keys.items() if key not in svg_cache]
+    if misses:
+        with ProcessPoolExecutor() as pool:
+            svg_cache.update(zip(
+                (icon_keys[svg_path] for svg_path in misses),
+                pool.map(process_icon_svg, misses, chunksize=16),
+            ))
+    processed = {svg_path: svg_cache[key] for svg_path, key in icon_keys.items()}
+
+    used_keys = set(icon_keys.values())
+    if os.path.isfile(LOGO_PATH):
+        used_keys.add(svg_cache_key(LOGO_PATH))
+    if used_keys != cached_keys:
+        save_svg_cache(cache_salt, {key: svg_cache[key] for key in used_keys if key in svg_cache})
+    print(f"SVG cache: {len(icon_keys) - len(misses)} hit(s), {len(misses)} cleaned")
+
+    # Column geometry is the same in every family: compute it (and the
+    # formatted label centres) once
+    column_x = [PAGE_MARGIN + col * CELL_WIDTH for col in range(COLS)]
+    column_label_x = [f'{x + CELL_WIDTH / 2:.2f}' for x in column_x]
+
     for fam_layout in family_layouts:
         family_name = fam_layout['name']
         icon_list = fam_layout['icons']
         header_y = fam_layout['header_y']
         grid_y = fam_layout['grid_y']
 
-        # Family header background
-        svg_parts.append(
-            f'<rect x="{PAGE_MARGIN}" y="{header_y}" '
-            f'width="{GRID_WIDTH}" height="{HEADER_HEIGHT}" '
-            f'fill="{HEADER_BG}" rx="3" ry="3"/>'
-        )
-
-        # Family header text
+        # Family header background, text and icon count badge
         text_y = header_y + HEADER_HEIGHT / 2
-        svg_parts.append(
-            f'<text x="{PAGE_MARGIN + 10}" y="{text_y}" '
-            f'font-family="{FONT}" font-size="14" font-weight="bold" '
-            f'fill="{HEADER_TEXT_COLOR}" '
-            f'dominant-baseline="central">'
-            f'{xml_escape(family_name)}</text>'
-        )
-
-        # Icon count badge
-        svg_parts.append(
-            f'<text x="{PAGE_MARGIN + GRID_WIDTH - 10}" y="{text_y}" '
-            f'font-family="{FONT}" font-size="10" '
-            f'fill="{LABEL_COLOR}" '
-            f'dominant-baseline="central" text-anchor="end">'
-            f'{len(icon_list)} icons</text>'
-        )
+        svg_parts.append(FAMILY_HEADER_RECT % header_y)
+        svg_parts.append(FAMILY_HEADER_TEXT % (text_y, xml_escape(family_name)))
+        svg_parts.append(FAMILY_COUNT_TEXT % (text_y, len(icon_list)))
 
         # Render each icon
         for idx, (icon_key, icon_info) in enumerate(icon_list):
-            col = idx % COLS
-            row = idx // COLS
-            cell_x = PAGE_MARGIN + col * CELL_WIDTH
+            row, col = divmod(idx, COLS)
+            cell_x = column_x[col]
             cell_y = grid_y + row * CELL_HEIGHT
 
             # Center of the icon area within the cell
             icon_area_top = cell_y + 4  # small top padding
             label_y = cell_y + CELL_HEIGHT - 10  # label near bottom
 
-            svg_file = os.path.join(SVG_DIR, icon_key + ".svg")
-            if not os.path.isfile(svg_file):
+            svg_file = svg_index.get(icon_key)
+            if svg_file is None:
                 icons_failed += 1
                 print(f"  WARNING: SVG not found for '{icon_key}'", file=sys.stderr)
                 continue
 
-            result = process_icon_svg(svg_file)
+            result = processed[svg_file]
             if result is None:
                 icons_failed += 1
                 print(f"  WARNING: Could not process '{icon_key}'", file=sys.stderr)
@@ -464,27 +845,10 @@ def main():
 
             vb_w, vb_h, cleaned_inner = result
 
-            # Calculate scale to fit within ICON_SIZE x ICON_SIZE
-            if vb_w <= 0 or vb_h <= 0:
-                scale = 1.0
-            else:
-                scale_x = ICON_SIZE / vb_w
-                scale_y = ICON_SIZE / vb_h
-                scale = min(scale_x, scale_y)
-
-            rendered_w = vb_w * scale
-            rendered_h = vb_h * scale
-
             # Center the icon horizontally in the cell, position at top of icon area
-            icon_x = cell_x + (CELL_WIDTH - rendered_w) / 2
-            icon_y = icon_area_top + (ICON_SIZE - rendered_h) / 2
-
-            # Wrap in a group with translate + scale
-            svg_parts.append(
-                f'<g transform="translate({icon_x:.2f},{icon_y:.2f}) scale({scale:.6f})">'
-            )
-            svg_parts.append(cleaned_inner)
-            svg_parts.append('</g>')
+            scale, offset_x, offset_y = fit_icon(vb_w, vb_h)
+            icon_x = cell_x + offset_x
+            icon_y = icon_area_top + offset_y
 
             # Label below icon
             display_name = icon_info.get('name', icon_key)
@@ -492,17 +856,31 @@ def main():
             if len(display_name) > 16:
                 display_name = display_name[:15] + '...'
 
-            label_center_x = cell_x + CELL_WIDTH / 2
-            svg_parts.append(
-                f'<text x="{label_center_x:.2f}" y="{label_y}" '
-                f'font-family="{FONT}" font-size="8" '
-                f'fill="{LABEL_COLOR}" '
-                f'text-anchor="middle">'
-                f'{xml_escape(display_name)}</text>'
-            )
+            if args.reusable:
+                # Each icon's content goes into <defs> once; cells reference it
+                ref = symbols.get(icon_key)
+                if ref is None:
+                    ref = 'icon-' + SYMBOL_ID_INVALID_RE.sub('_', icon_key)
+                    symbols[icon_key] = ref
+                    symbol_defs.append(SYMBOL_TEMPLATE.format(
+                        ref=ref, vw=vb_w, vh=vb_h, inner=cleaned_inner,
+                    ))
+                svg_parts.append(USE_TEMPLATE.format(
+                    ref=ref, ix=icon_x, iy=icon_y, w=vb_w * scale, h=vb_h * scale,
+                    lx=column_label_x[col], ly=label_y, name=xml_escape(display_name),
+                ))
+            else:
+                # Icon group (translate + scale) and its label in one fragment
+                svg_parts.append(ICON_TEMPLATE.format(
+                    ix=icon_x, iy=icon_y, sc=scale, inner=cleaned_inner,
+                    lx=column_label_x[col], ly=label_y, name=xml_escape(display_name),
+                ))
 
             icons_embedded += 1
 
+    if symbol_defs:
+        svg_parts.insert(defs_index, '<defs>\n' + '\n'.join(symbol_defs) + '\n</defs>')
+
     # Close SVG
     svg_parts.append('</svg>')
 
@@ -511,17 +889,25 @@ def main():
     # -------------------------------------------------------------------
     os.makedirs(OUTPUT_DIR, exist_ok=True)
 
-    output_svg = '\n'.join(svg_parts)
-    with open(OUTPUT_PATH, 'w', encoding='utf-8') as f:
-        f.write(output_svg)
-
+    # Stream the parts instead of joining a second full copy of the
+    # document in memory
+    with open(OUTPUT_PATH, 'w', encoding='utf-8', buffering=OUTPUT_BUFFER_SIZE) as f:
+        write_svg_parts(f, svg_parts)
     file_size = os.path.getsize(OUTPUT_PATH)
 
+    if args.svgz:
+        with open_svgz(SVGZ_PATH) as f:
+            write_svg_parts(f, svg_parts)
+        svgz_size = os.path.getsize(SVGZ_PATH)
+
     # -------------------------------------------------------------------
     # Report
     # -------------------------------------------------------------------
     print(f"Grid SVG generated: {OUTPUT_PATH}")
     print(f"  File size:       {file_size:,} bytes ({file_size / 1024:.1f} KB)")
+    if args.svgz:
+        print(f"  Compressed:      {SVGZ_PATH}")
+        print(f"                   {svgz_size:,} bytes ({svgz_size / 1024:.1f} KB)")
     print(f"  Icons embedded:  {icons_embedded}")
     if icons_failed:
         print(f"  Icons failed:    {icons_failed}")
@@ -7,31 +7,40 @@ SVG images with a PNG fallback.  Modern PowerPoint (Office 365 / 2019+) will
 display the SVG natively; the user can right-click any icon and choose
 "Convert to Shape" to get fully editable, color-changeable vector shapes.
 
+Usage:
+    python scripts/generate-pptx.py [--fast | --release]
+
+--fast saves with the quickest deflate level (for development builds),
+--release with the smallest; the default sits in between.
+
 Dependencies (all in .venv):
     python-pptx >= 1.0
     lxml
     Pillow
 """
 
+import argparse
 import io
 import json
 import math
 import os
 import re
-import struct
 import sys
-import zlib
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
 
 from lxml import etree
 from PIL import Image as PILImage, ImageDraw
 
 from pptx import Presentation
 from pptx.util import Inches, Pt, Emu
-from pptx.enum.text import PP_ALIGN, MSO_ANCHOR
+from pptx.enum.text import PP_ALIGN
 from pptx.dml.color import RGBColor
-from pptx.oxml.ns import qn
+from pptx.oxml import parse_xml
+from pptx.oxml.ns import nsdecls
 from pptx.opc.package import Part
 from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from pptx.opc import serialized
 from pptx.opc.packuri import PackURI
 
 # ---------------------------------------------------------------------------
@@ -50,6 +59,10 @@ PAGE_LEFT_MARGIN_IN = 0.45      # left margin
 PAGE_BOTTOM_MARGIN_IN = 0.35    # bottom margin reserved
 SLIDE_WIDTH_IN = 13.333         # widescreen
 SLIDE_HEIGHT_IN = 7.5
+SAVE_COMPRESS_LEVEL = 6         # deflate level for the .pptx (zipfile default)
+FAST_COMPRESS_LEVEL = 1         # --fast
+RELEASE_COMPRESS_LEVEL = 9      # --release
+STORE_MAX_BYTES = 64            # parts smaller than this are stored, not deflated
 
 # Derived
 USABLE_HEIGHT_IN = SLIDE_HEIGHT_IN - PAGE_TOP_MARGIN_IN - PAGE_BOTTOM_MARGIN_IN
@@ -58,6 +71,22 @@ HEADER_TEXT_COLOR = RGBColor(0x33, 0x33, 0x33)
 HEADER_BG_COLOR = RGBColor(0xE8, 0xF4, 0xFB)  # light blue tint
 UN_BLUE = RGBColor(0x00, 0x9E, 0xDB)
 
+# Layout in EMU (914400 per inch), as plain ints computed once; the slide
+# loop only adds these up
+EMU_PER_IN = 914400
+CELL_LEFT_EMU = tuple(
+    int((PAGE_LEFT_MARGIN_IN + col * COL_WIDTH_IN) * EMU_PER_IN) for col in range(COLS)
+)
+COL_WIDTH_EMU = int(COL_WIDTH_IN * EMU_PER_IN)
+ROW_HEIGHT_EMU = int(ROW_HEIGHT_IN * EMU_PER_IN)
+PAGE_TOP_MARGIN_EMU = int(PAGE_TOP_MARGIN_IN * EMU_PER_IN)
+HEADER_LEFT_EMU = int(PAGE_LEFT_MARGIN_IN * EMU_PER_IN)
+HEADER_WIDTH_EMU = int((SLIDE_WIDTH_IN - 2 * PAGE_LEFT_MARGIN_IN) * EMU_PER_IN)
+HEADER_HEIGHT_EMU = int(HEADER_HEIGHT_IN * EMU_PER_IN)
+HEADER_BLOCK_EMU = int((HEADER_HEIGHT_IN + 0.05) * EMU_PER_IN)  # header + gap
+LABEL_OFFSET_EMU = int((ICON_SIZE_IN + 0.02) * EMU_PER_IN)      # icon top -> label
+LABEL_HEIGHT_EMU = int(0.30 * EMU_PER_IN)
+
 # Namespace constants for SVG-in-PPTX
 ASVG_URI = "http://schemas.microsoft.com/office/drawing/2016/SVG/main"
 SVG_EXT_URI = "{96DAC541-7B7A-43D3-8B79-37D633B846F1}"
@@ -77,249 +106,298 @@ SHAPE_ELEMENTS = {"path", "circle", "rect", "polygon", "ellipse", "line", "polyl
 
 
 # ---------------------------------------------------------------------------
-# PNG fallback: create a small transparent PNG (1x1 pixel)
+# PNG fallback: a minimal 1x1 transparent PNG (8-bit RGBA), as a literal
 # ---------------------------------------------------------------------------
-def make_fallback_png():
-    """Create a minimal 1x1 transparent PNG as bytes."""
-    def _chunk(chunk_type, data):
-        c = chunk_type + data
-        return (struct.pack(">I", len(data)) + c
-                + struct.pack(">I", zlib.crc32(c) & 0xFFFFFFFF))
+FALLBACK_PNG = (
+    b"\x89PNG\r\n\x1a\n"
+    b"\x00\x00\x00\rIHDR\x00\x00\x00\x01\x00\x00\x00\x01\x08\x06\x00\x00\x00\x1f\x15\xc4\x89"
+    b"\x00\x00\x00\x0bIDATx\x9cc`\x00\x02\x00\x00\x05\x00\x01z^\xab?"
+    b"\x00\x00\x00\x00IEND\xaeB`\x82"
+)
 
-    ihdr = struct.pack(">IIBBBBB", 1, 1, 8, 6, 0, 0, 0)
-    raw = b"\x00" + bytes([0, 0, 0, 0])
-    idat = zlib.compress(raw)
 
-    png = b"\x89PNG\r\n\x1a\n"
-    png += _chunk(b"IHDR", ihdr)
-    png += _chunk(b"IDAT", idat)
-    png += _chunk(b"IEND", b"")
-    return png
+# ---------------------------------------------------------------------------
+# SVG cleaning  (adapted from generate-grid.py)
+# ---------------------------------------------------------------------------
+SVG_NS = "http://www.w3.org/2000/svg"
+SVG_TAG = f"{{{SVG_NS}}}svg"
 
+# Element tags as lxml reports them: SVG-namespaced, or bare for files that
+# omit the xmlns declaration
+STRIP_TAGS = frozenset(
+    [f"{{{SVG_NS}}}{t}" for t in ("defs", "style", "title")] + ["defs", "style", "title"]
+)
+SHAPE_TAGS = frozenset([f"{{{SVG_NS}}}{t}" for t in SHAPE_ELEMENTS] + list(SHAPE_ELEMENTS))
 
-# Pre-generate once
-FALLBACK_PNG = make_fallback_png()
+# Comments, processing instructions and indentation never reach the deck
+XML_PARSER = etree.XMLParser(
+    remove_blank_text=True,
+    remove_comments=True,
+    remove_pis=True,
+)
 
+# Matches CSS rules like .cls-1{...fill-rule:evenodd...}
+EVENODD_CLASS_RE = re.compile(r"\.([\w-]+)\s*\{[^}]*fill-rule\s*:\s*evenodd[^}]*\}")
 
-# ---------------------------------------------------------------------------
-# SVG cleaning  (adapted from generate-grid.py)
-# ---------------------------------------------------------------------------
-def parse_viewbox(svg_text):
-    """Return (min_x, min_y, width, height) from the viewBox attribute."""
-    m = re.search(r'viewBox\s*=\s*"([^"]+)"', svg_text)
-    if not m:
-        return (0, 0, 48, 48)
-    parts = m.group(1).split()
-    return tuple(float(p) for p in parts)
-
-
-def _extract_style_text(svg_text):
-    """Extract the CSS <style> content (for evenodd detection)."""
-    m = re.search(r"<style[^>]*>(.*?)</style>", svg_text, re.DOTALL)
-    return m.group(1) if m else ""
-
-
-def _extract_inner(svg_text):
-    """Return the content between <svg ...> and </svg>, stripped of
-    <?xml>, comments, <defs>, <style>, <title>."""
-    t = re.sub(r"<\?xml[^?]*\?>", "", svg_text)
-    t = re.sub(r"<!--.*?-->", "", t, flags=re.DOTALL)
-    m = re.search(r"<svg[^>]*>(.*)</svg>", t, re.DOTALL)
-    if not m:
-        return ""
-    inner = m.group(1)
-    inner = re.sub(r"<defs>.*?</defs>", "", inner, flags=re.DOTALL)
-    inner = re.sub(r"<defs\s[^>]*>.*?</defs>", "", inner, flags=re.DOTALL)
-    inner = re.sub(r"<style[^>]*>.*?</style>", "", inner, flags=re.DOTALL)
-    inner = re.sub(r"<title>.*?</title>", "", inner, flags=re.DOTALL)
-    return inner.strip()
-
-
-def _clean_inner(inner_svg, style_text, fill_color):
-    """Resolve CSS classes to direct fill attributes."""
-    # Determine which classes use fill-rule:evenodd
-    evenodd_classes = set()
-    if style_text:
-        for m in re.finditer(
-            r"\.([\w-]+)\s*\{[^}]*fill-rule\s*:\s*evenodd[^}]*\}", style_text
-        ):
-            evenodd_classes.add(m.group(1))
-
-    def _process(match):
-        tag = match.group(0)
-        em = re.match(r"<(\w+)", tag)
-        if not em:
-            return tag
-        elem = em.group(1)
-
-        # Check evenodd before removing class
-        needs_evenodd = False
-        cls_m = re.search(r'class="([^"]*)"', tag)
-        if cls_m and evenodd_classes:
-            for c in cls_m.group(1).split():
-                if c in evenodd_classes:
-                    needs_evenodd = True
-                    break
-
-        # Strip class and style attributes
-        tag = re.sub(r'\s+class="[^"]*"', "", tag)
-        tag = re.sub(r'\s+style="[^"]*"', "", tag)
-
-        if elem not in SHAPE_ELEMENTS:
-            return tag
-
-        if not re.search(r"\bfill\s*=", tag):
-            tag = tag.replace(
-                "<" + elem, '<' + elem + ' fill="' + fill_color + '"', 1
-            )
-        if needs_evenodd and "fill-rule" not in tag:
-            tag = tag.replace(
-                "<" + elem, "<" + elem + ' fill-rule="evenodd"', 1
-            )
-        return tag
 
-    return re.sub(r"<(\w+)(?:\s[^>]*)?\s*/?>", _process, inner_svg)
+def evenodd_classes_in(style_text):
+    """Return the CSS classes whose rules set fill-rule:evenodd."""
+    if not style_text or "fill-rule" not in style_text:
+        return set()
+    return {m.group(1) for m in EVENODD_CLASS_RE.finditer(style_text)}
 
 
 def clean_svg(svg_path, fill_color=ICON_COLOR):
     """Read an SVG file and return a complete, self-contained, cleaned SVG
-    string ready for embedding in PPTX."""
-    with open(svg_path, "r", encoding="utf-8") as f:
-        raw = f.read()
+    document (UTF-8 bytes) ready for embedding in PPTX.
 
-    _, _, vb_w, vb_h = parse_viewbox(raw)
-    style = _extract_style_text(raw)
-    inner = _extract_inner(raw)
-    if not inner:
-        return None, vb_w, vb_h
+    The file is parsed once; <defs>, <style> and <title> are dropped,
+    class/style attributes removed and shapes given a direct fill (plus
+    fill-rule="evenodd" where their CSS class had it).  Returns
+    (svg_bytes, vb_w, vb_h), with svg_bytes None if the file is not
+    well-formed XML.
+    """
+    with open(svg_path, "rb") as f:
+        raw = f.read()
+    try:
+        root = etree.fromstring(raw, XML_PARSER)
+    except etree.XMLSyntaxError:
+        return None, 48, 48
+
+    viewbox = root.get("viewBox")
+    if viewbox:
+        parts = viewbox.split()
+        vb_w, vb_h = float(parts[2]), float(parts[3])
+    else:
+        vb_w, vb_h = 48, 48
+
+    # Which CSS classes have fill-rule:evenodd (first <style> only). Without
+    # any class attribute no rule can apply, so the <style> search is skipped.
+    if b"class=" in raw:
+        style_el = next(root.iter(f"{{{SVG_NS}}}style", "style"), None)
+        evenodd_classes = evenodd_classes_in(style_el.text if style_el is not None else None)
+    else:
+        evenodd_classes = set()
+
+    doomed = []
+    for el in root.iterdescendants():
+        tag = el.tag
+        if tag in STRIP_TAGS:
+            doomed.append(el)
+            continue
+        attrib = el.attrib
+        classes = attrib.pop("class", None)
+        attrib.pop("style", None)
+        if tag not in SHAPE_TAGS:
+            continue
+        if "fill" not in attrib:
+            attrib["fill"] = fill_color
+        if evenodd_classes and classes and "fill-rule" not in attrib:
+            if not evenodd_classes.isdisjoint(classes.split()):
+                attrib["fill-rule"] = "evenodd"
+
+    for el in doomed:
+        parent = el.getparent()
+        if parent is not None:  # already gone with a stripped ancestor
+            parent.remove(el)
+
+    if root.tag != SVG_TAG:
+        # No xmlns in the file: move the content under an SVG-namespaced root
+        for el in root.iterdescendants():
+            if isinstance(el.tag, str) and not el.tag.startswith("{"):
+                el.tag = f"{{{SVG_NS}}}{el.tag}"
+        svg_root = etree.Element(SVG_TAG, nsmap={None: SVG_NS})
+        svg_root.extend(root)
+        root = svg_root
+
+    # Replace the root attributes with the normalised viewport
+    root.attrib.clear()
+    root.set("viewBox", f"0 0 {vb_w} {vb_h}")
+    root.set("width", f"{vb_w}")
+    root.set("height", f"{vb_h}")
+
+    # Drop namespace declarations (e.g. xlink) left unused
+    etree.cleanup_namespaces(root)
+    return etree.tostring(root, encoding="utf-8"), vb_w, vb_h
 
-    cleaned = _clean_inner(inner, style, fill_color)
 
-    # Rebuild a complete, self-contained SVG
-    svg_doc = (
-        f'<svg xmlns="http://www.w3.org/2000/svg" '
-        f'viewBox="0 0 {vb_w} {vb_h}" '
-        f'width="{vb_w}" height="{vb_h}">'
-        f"{cleaned}</svg>"
-    )
-    return svg_doc, vb_w, vb_h
+# ---------------------------------------------------------------------------
+# Shape XML templates
+# ---------------------------------------------------------------------------
+# Icon cells and headers are built from these and appended to the slide's
+# shape tree directly; going through python-pptx's shape and text-frame
+# setters costs many element lookups and mutations per shape.
+XML_ESCAPE_TABLE = str.maketrans({
+    "&": "&amp;",
+    "<": "&lt;",
+    ">": "&gt;",
+    '"': "&quot;",
+})
+
+PIC_TEMPLATE = (
+    f"<p:pic {nsdecls('p', 'a', 'r')}>"
+    '<p:nvPicPr><p:cNvPr id="{shape_id}" name="Picture {shape_num}" descr="{descr}"/>'
+    '<p:cNvPicPr><a:picLocks noChangeAspect="1"/></p:cNvPicPr><p:nvPr/></p:nvPicPr>'
+    '<p:blipFill><a:blip r:embed="{png_rid}"><a:extLst>'
+    '<a:ext uri="{ext_uri}"><asvg:svgBlip xmlns:asvg="{asvg_uri}" '
+    'r:embed="{svg_rid}"/></a:ext>'
+    "</a:extLst></a:blip><a:stretch><a:fillRect/></a:stretch></p:blipFill>"
+    '<p:spPr><a:xfrm><a:off x="{x}" y="{y}"/><a:ext cx="{cx}" cy="{cy}"/></a:xfrm>'
+    '<a:prstGeom prst="rect"><a:avLst/></a:prstGeom></p:spPr>'
+    "</p:pic>"
+)
+
+TEXTBOX_TEMPLATE = (
+    f"<p:sp {nsdecls('p', 'a', 'r')}>"
+    '<p:nvSpPr><p:cNvPr id="{shape_id}" name="TextBox {shape_num}"/>'
+    '<p:cNvSpPr txBox="1"/><p:nvPr/></p:nvSpPr>'
+    '<p:spPr><a:xfrm><a:off x="{x}" y="{y}"/><a:ext cx="{cx}" cy="{cy}"/></a:xfrm>'
+    '<a:prstGeom prst="rect"><a:avLst/></a:prstGeom><a:noFill/></p:spPr>'
+    '<p:txBody><a:bodyPr wrap="square"/><a:lstStyle/><a:p>'
+    '<a:pPr algn="{align}"><a:spcBef><a:spcPts val="0"/></a:spcBef>'
+    '<a:spcAft><a:spcPts val="0"/></a:spcAft>'
+    '<a:defRPr sz="{size}" b="{bold}"><a:solidFill><a:srgbClr val="{color}"/></a:solidFill>'
+    '<a:latin typeface="{font}"/></a:defRPr></a:pPr>'
+    "<a:r><a:t>{text}</a:t></a:r></a:p></p:txBody>"
+    "</p:sp>"
+)
+
+HEADER_RUN_TEMPLATE = (
+    '<a:r><a:rPr sz="{size}" b="{bold}"><a:solidFill><a:srgbClr val="{color}"/></a:solidFill>'
+    '<a:latin typeface="Arial"/></a:rPr><a:t>{text}</a:t></a:r>'
+)
+
+HEADER_TEMPLATE = (
+    f"<p:sp {nsdecls('p', 'a', 'r')}>"
+    '<p:nvSpPr><p:cNvPr id="{shape_id}" name="Rectangle {shape_num}"/>'
+    "<p:cNvSpPr/><p:nvPr/></p:nvSpPr>"
+    '<p:spPr><a:xfrm><a:off x="{x}" y="{y}"/><a:ext cx="{cx}" cy="{cy}"/></a:xfrm>'
+    '<a:prstGeom prst="rect"><a:avLst/></a:prstGeom>'
+    f'<a:solidFill><a:srgbClr val="{HEADER_BG_COLOR}"/></a:solidFill>'
+    "<a:ln><a:noFill/></a:ln></p:spPr>"
+    '<p:style><a:lnRef idx="1"><a:schemeClr val="accent1"/></a:lnRef>'
+    '<a:fillRef idx="3"><a:schemeClr val="accent1"/></a:fillRef>'
+    '<a:effectRef idx="2"><a:schemeClr val="accent1"/></a:effectRef>'
+    '<a:fontRef idx="minor"><a:schemeClr val="lt1"/></a:fontRef></p:style>'
+    '<p:txBody><a:bodyPr rtlCol="0" anchor="ctr" wrap="none"/><a:lstStyle/>'
+    '<a:p><a:pPr algn="l"/>{runs}</a:p></p:txBody>'
+    "</p:sp>"
+)
+
+
+def xml_escape(text):
+    """Escape text for use in XML content and double-quoted attributes."""
+    return text.translate(XML_ESCAPE_TABLE)
 
 
 # ---------------------------------------------------------------------------
 # Add an SVG picture to a slide  (PNG fallback + SVG via asvg:svgBlip)
 # ---------------------------------------------------------------------------
 _svg_counter = 0
+_svg_parts = {}  # icon_key -> SVG Part, shared by every slide that uses it
+_fallback_png_part = None
 
 
-def add_svg_picture(slide, svg_bytes, left, top, width, height, prs, desc=""):
-    """Insert an SVG as a picture shape.
+def add_svg_picture(slide, shape_id, svg_bytes, left, top, width, height, prs,
+                    desc="", icon_key=None):
+    """Insert an SVG as a picture shape with the given shape id.
 
-    Creates a PNG fallback image placeholder, then attaches the SVG data via
+    The picture shows the tiny fallback PNG and attaches the SVG data via
     the Office ``asvg:svgBlip`` extension so PowerPoint renders the SVG
-    natively.
+    natively.  The PNG part is stored once for the whole deck; with an
+    ``icon_key`` the SVG part is also created once and related from every
+    slide that places the same icon.
     """
-    global _svg_counter
-    _svg_counter += 1
+    global _svg_counter, _fallback_png_part
 
     slide_part = slide.part
 
-    # 1) Add picture using the tiny fallback PNG
-    pic_shape = slide.shapes.add_picture(
-        io.BytesIO(FALLBACK_PNG), left, top, width, height
-    )
-
-    # Update the description for accessibility
-    if desc:
-        pic_shape._element.find(qn("p:nvPicPr")).find(qn("p:cNvPr")).set(
-            "descr", desc
+    # 1) Relate the shared fallback PNG to the slide
+    if _fallback_png_part is None:
+        _fallback_png_part = prs.part.package.get_or_add_image_part(
+            io.BytesIO(FALLBACK_PNG)
         )
-
-    # 2) Create an SVG part and relate it to the slide
-    svg_part_name = PackURI(f"/ppt/media/image_svg{_svg_counter}.svg")
-    svg_part = Part(
-        svg_part_name,
-        "image/svg+xml",
-        blob=svg_bytes,
-        package=prs.part.package,
-    )
+    png_rId = slide_part.relate_to(_fallback_png_part, RT.IMAGE)
+
+    # 2) Create (or reuse) the SVG part and relate it to the slide
+    svg_part = _svg_parts.get(icon_key)
+    if svg_part is None:
+        _svg_counter += 1
+        svg_part_name = PackURI(f"/ppt/media/image_svg{_svg_counter}.svg")
+        svg_part = Part(
+            svg_part_name,
+            "image/svg+xml",
+            blob=svg_bytes,
+            package=prs.part.package,
+        )
+        if icon_key is not None:
+            _svg_parts[icon_key] = svg_part
     svg_rId = slide_part.relate_to(svg_part, RT.IMAGE)
 
-    # 3) Inject the <a:extLst><a:ext><asvg:svgBlip .../></a:ext></a:extLst>
-    #    into the <a:blip> element of the picture
-    blip = pic_shape._element.find(".//" + qn("a:blip"))
-    ext_lst = etree.SubElement(blip, qn("a:extLst"))
-    ext_el = etree.SubElement(ext_lst, qn("a:ext"))
-    ext_el.set("uri", SVG_EXT_URI)
-    svg_blip = etree.SubElement(ext_el, f"{{{ASVG_URI}}}svgBlip")
-    svg_blip.set(qn("r:embed"), svg_rId)
-
-    return pic_shape
+    # 3) The <p:pic>, with the SVG blip in the <a:blip> extension list
+    slide.shapes._spTree.append(parse_xml(PIC_TEMPLATE.format(
+        shape_id=shape_id,
+        shape_num=shape_id - 1,
+        descr=xml_escape(desc),
+        png_rid=png_rId,
+        ext_uri=SVG_EXT_URI,
+        asvg_uri=ASVG_URI,
+        svg_rid=svg_rId,
+        x=int(left),
+        y=int(top),
+        cx=int(width),
+        cy=int(height),
+    )))
 
 
 # ---------------------------------------------------------------------------
 # Add a text box helper
 # ---------------------------------------------------------------------------
-def add_textbox(slide, text, left, top, width, height, font_size=Pt(8),
+def add_textbox(slide, shape_id, text, left, top, width, height, font_size=Pt(8),
                 font_color=ICON_LABEL_COLOR, bold=False, alignment=PP_ALIGN.CENTER,
                 font_name="Arial"):
-    """Add a simple single-line text box."""
-    txBox = slide.shapes.add_textbox(left, top, width, height)
-    tf = txBox.text_frame
-    tf.word_wrap = True
-    tf.auto_size = None  # do not auto-resize
-    p = tf.paragraphs[0]
-    p.text = text
-    p.font.size = font_size
-    p.font.color.rgb = font_color
-    p.font.bold = bold
-    p.font.name = font_name
-    p.alignment = alignment
-    # Vertical alignment: top
-    tf.paragraphs[0].space_before = Pt(0)
-    tf.paragraphs[0].space_after = Pt(0)
-    return txBox
+    """Add a simple single-line text box with the given shape id."""
+    slide.shapes._spTree.append(parse_xml(TEXTBOX_TEMPLATE.format(
+        shape_id=shape_id,
+        shape_num=shape_id - 1,
+        x=int(left),
+        y=int(top),
+        cx=int(width),
+        cy=int(height),
+        align=alignment.xml_value,
+        size=font_size.centipoints,
+        bold=int(bold),
+        color=font_color,
+        font=xml_escape(font_name),
+        text=xml_escape(text),
+    )))
 
 
 # ---------------------------------------------------------------------------
 # Add a family header bar
 # ---------------------------------------------------------------------------
-def add_family_header(slide, family_name, icon_count, y_pos):
+def add_family_header(slide, shape_id, family_name, icon_count, y_pos):
     """Draw a coloured header bar with the family name and icon count."""
-    left = Inches(PAGE_LEFT_MARGIN_IN)
-    width = Inches(SLIDE_WIDTH_IN - 2 * PAGE_LEFT_MARGIN_IN)
-    height = Inches(HEADER_HEIGHT_IN)
-
-    # Background rectangle
-    shape = slide.shapes.add_shape(
-        1,  # MSO_SHAPE.RECTANGLE
-        left, y_pos, width, height
+    runs = HEADER_RUN_TEMPLATE.format(
+        size=HEADER_FONT_SIZE.centipoints,
+        bold=1,
+        color=HEADER_TEXT_COLOR,
+        text=xml_escape(f"  {family_name}"),
+    ) + HEADER_RUN_TEMPLATE.format(
+        size=Pt(9).centipoints,
+        bold=0,
+        color=RGBColor(0x88, 0x88, 0x88),
+        text=f"   ({icon_count} icons)",
     )
-    shape.fill.solid()
-    shape.fill.fore_color.rgb = HEADER_BG_COLOR
-    shape.line.fill.background()  # no border
-
-    # Family name text
-    tf = shape.text_frame
-    tf.word_wrap = False
-    p = tf.paragraphs[0]
-    p.alignment = PP_ALIGN.LEFT
-
-    run = p.add_run()
-    run.text = f"  {family_name}"
-    run.font.size = HEADER_FONT_SIZE
-    run.font.color.rgb = HEADER_TEXT_COLOR
-    run.font.bold = True
-    run.font.name = "Arial"
-
-    # Icon count
-    run2 = p.add_run()
-    run2.text = f"   ({icon_count} icons)"
-    run2.font.size = Pt(9)
-    run2.font.color.rgb = RGBColor(0x88, 0x88, 0x88)
-    run2.font.bold = False
-    run2.font.name = "Arial"
-
-    tf.vertical_anchor = MSO_ANCHOR.MIDDLE
+    slide.shapes._spTree.append(parse_xml(HEADER_TEMPLATE.format(
+        shape_id=shape_id,
+        shape_num=shape_id - 1,
+        x=HEADER_LEFT_EMU,
+        y=int(y_pos),
+        cx=HEADER_WIDTH_EMU,
+        cy=HEADER_HEIGHT_EMU,
+        runs=runs,
+    )))
 
 
 # ---------------------------------------------------------------------------
@@ -333,10 +411,94 @@ def rows_per_slide(has_header):
     return max(1, int(available / ROW_HEIGHT_IN))
 
 
+# ---------------------------------------------------------------------------
+# Icon placement within a cell
+# ---------------------------------------------------------------------------
+def icon_box_emu(vb_w, vb_h):
+    """Return (left_offset, top_offset, width, height) in EMU for an icon
+    with the given viewBox size, fitted to ICON_SIZE_IN preserving its
+    aspect ratio and centred in the cell."""
+    if vb_w > 0 and vb_h > 0:
+        aspect = vb_w / vb_h
+        if aspect >= 1:
+            # Wider than tall: fit to width
+            disp_w = ICON_SIZE_IN
+            disp_h = ICON_SIZE_IN / aspect
+        else:
+            # Taller than wide: fit to height
+            disp_h = ICON_SIZE_IN
+            disp_w = ICON_SIZE_IN * aspect
+    else:
+        disp_w = ICON_SIZE_IN
+        disp_h = ICON_SIZE_IN
+
+    return (
+        int((COL_WIDTH_IN - disp_w) / 2 * EMU_PER_IN),
+        int((ICON_SIZE_IN - disp_h) / 2 * EMU_PER_IN),
+        int(disp_w * EMU_PER_IN),
+        int(disp_h * EMU_PER_IN),
+    )
+
+
+# ---------------------------------------------------------------------------
+# Saving
+# ---------------------------------------------------------------------------
+class LeveledZipPkgWriter(serialized._ZipPkgWriter):
+    """python-pptx's zip writer with a chosen deflate level.  Parts under
+    STORE_MAX_BYTES are stored: deflate would barely shrink them."""
+
+    def __init__(self, pkg_file, compresslevel):
+        super().__init__(pkg_file)
+        self._compresslevel = compresslevel
+
+    def write(self, pack_uri, blob):
+        if len(blob) < STORE_MAX_BYTES:
+            self._zipf.writestr(pack_uri.membername, blob, compress_type=zipfile.ZIP_STORED)
+        else:
+            self._zipf.writestr(
+                pack_uri.membername, blob, compresslevel=self._compresslevel
+            )
+
+
+def save_presentation(prs, path, compresslevel=SAVE_COMPRESS_LEVEL):
+    """Save ``prs`` to ``path`` through LeveledZipPkgWriter."""
+    factory = serialized._PhysPkgWriter.factory
+    serialized._PhysPkgWriter.factory = (
+        lambda pkg_file: LeveledZipPkgWriter(pkg_file, compresslevel)
+    )
+    try:
+        prs.save(path)
+    finally:
+        serialized._PhysPkgWriter.factory = factory
+
+
 # ---------------------------------------------------------------------------
 # Main
 # ---------------------------------------------------------------------------
-def main():
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate the OCHA humanitarian icons PowerPoint.")
+    level = parser.add_mutually_exclusive_group()
+    level.add_argument(
+        "--fast",
+        dest="compresslevel",
+        action="store_const",
+        const=FAST_COMPRESS_LEVEL,
+        help=f"save with deflate level {FAST_COMPRESS_LEVEL} (quickest, larger file)",
+    )
+    level.add_argument(
+        "--release",
+        dest="compresslevel",
+        action="store_const",
+        const=RELEASE_COMPRESS_LEVEL,
+        help=f"save with deflate level {RELEASE_COMPRESS_LEVEL} (smallest file)",
+    )
+    parser.set_defaults(compresslevel=SAVE_COMPRESS_LEVEL)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
     print("=" * 60)
     print("OCHA Humanitarian Icons -- PowerPoint Generator")
     print("=" * 60)
@@ -356,6 +518,26 @@ def main():
     for fam in families:
         families[fam].sort(key=lambda x: x[1]["name"].lower())
 
+    # --- Clean every icon SVG up front in worker processes (CPU-bound and
+    #     independent per file); slide assembly below stays serial ---
+    # One directory listing replaces a path join and stat per icon
+    svg_index = {
+        entry.name[:-4]: entry.path
+        for entry in os.scandir(SVG_DIR)
+        if entry.name.endswith(".svg") and entry.is_file()
+    }
+    svg_paths = {
+        icon_key: svg_index[icon_key] for icon_key in icons_data if icon_key in svg_index
+    }
+    # Each icon's placement box is computed here too, once per icon
+    with ProcessPoolExecutor() as pool:
+        cleaned = {
+            icon_key: (svg_bytes, icon_box_emu(vb_w, vb_h))
+            for icon_key, (svg_bytes, vb_w, vb_h) in zip(
+                svg_paths, pool.map(clean_svg, svg_paths.values(), chunksize=16)
+            )
+        }
+
     # --- Create presentation ---
     prs = Presentation()
     prs.slide_width = Inches(SLIDE_WIDTH_IN)
@@ -380,19 +562,22 @@ def main():
         while idx < num_icons:
             slide = prs.slides.add_slide(blank_layout)
             total_slides += 1
+            shape_id = 2  # id 1 is the slide's shape tree itself
 
-            y_cursor = Inches(PAGE_TOP_MARGIN_IN)
+            y_cursor = PAGE_TOP_MARGIN_EMU
 
             # Header on the first slide of each family
             if first_slide_of_family:
-                add_family_header(slide, fam_name, num_icons, y_cursor)
-                y_cursor += Inches(HEADER_HEIGHT_IN + 0.05)
+                add_family_header(slide, shape_id, fam_name, num_icons, y_cursor)
+                shape_id += 1
+                y_cursor += HEADER_BLOCK_EMU
                 max_rows = rows_per_slide(has_header=True)
                 first_slide_of_family = False
             else:
                 # Continuation: add a lighter sub-header
-                add_family_header(slide, f"{fam_name} (cont.)", num_icons, y_cursor)
-                y_cursor += Inches(HEADER_HEIGHT_IN + 0.05)
+                add_family_header(slide, shape_id, f"{fam_name} (cont.)", num_icons, y_cursor)
+                shape_id += 1
+                y_cursor += HEADER_BLOCK_EMU
                 max_rows = rows_per_slide(has_header=True)
 
             # Fill rows
@@ -407,67 +592,42 @@ def main():
                     idx += 1
 
                     # Cell position
-                    cell_left = Inches(
-                        PAGE_LEFT_MARGIN_IN + col * COL_WIDTH_IN
-                    )
+                    cell_left = CELL_LEFT_EMU[col]
                     icon_top = y_cursor
-                    label_top = icon_top + Inches(ICON_SIZE_IN + 0.02)
+                    label_top = icon_top + LABEL_OFFSET_EMU
 
-                    # Load and clean SVG
-                    svg_path = os.path.join(SVG_DIR, icon_key + ".svg")
-                    if not os.path.isfile(svg_path):
+                    # Cleaned SVG
+                    if icon_key not in cleaned:
                         total_failed += 1
                         print(f"    WARNING: SVG not found: {icon_key}")
                         continue
 
-                    result = clean_svg(svg_path, ICON_COLOR)
-                    svg_doc, vb_w, vb_h = result
-                    if svg_doc is None:
+                    svg_bytes, (dx, dy, disp_w, disp_h) = cleaned[icon_key]
+                    if svg_bytes is None:
                         total_failed += 1
                         print(f"    WARNING: could not process: {icon_key}")
                         continue
 
-                    svg_bytes = svg_doc.encode("utf-8")
-
-                    # Calculate display size preserving aspect ratio
                     display_name = icon_info.get("name", icon_key)
-                    if vb_w > 0 and vb_h > 0:
-                        aspect = vb_w / vb_h
-                        if aspect >= 1:
-                            # Wider than tall: fit to width
-                            disp_w = ICON_SIZE_IN
-                            disp_h = ICON_SIZE_IN / aspect
-                        else:
-                            # Taller than wide: fit to height
-                            disp_h = ICON_SIZE_IN
-                            disp_w = ICON_SIZE_IN * aspect
-                    else:
-                        disp_w = ICON_SIZE_IN
-                        disp_h = ICON_SIZE_IN
-
-                    # Centre icon within cell
-                    icon_left_adj = cell_left + Inches(
-                        (COL_WIDTH_IN - disp_w) / 2
-                    )
-                    icon_top_adj = icon_top + Inches(
-                        (ICON_SIZE_IN - disp_h) / 2
-                    )
 
                     try:
                         add_svg_picture(
                             slide,
+                            shape_id,
                             svg_bytes,
-                            icon_left_adj,
-                            icon_top_adj,
-                            Inches(disp_w),
-                            Inches(disp_h),
+                            cell_left + dx,
+                            icon_top + dy,
+                            disp_w,
+                            disp_h,
                             prs,
                             desc=display_name,
+                            icon_key=icon_key,
                         )
                     except Exception as exc:
                         total_failed += 1
                         print(f"    ERROR inserting {icon_key}: {exc}")
                         continue
+                    shape_id += 1
 
                     # Label below icon
                     label_text = display_name
@@ -475,24 +635,26 @@ def main():
                         label_text = label_text[:19] + "\u2026"
                     add_textbox(
                         slide,
+                        shape_id,
                         label_text,
                         cell_left,
                         label_top,
-                        Inches(COL_WIDTH_IN),
-                        Inches(0.30),
+                        COL_WIDTH_EMU,
+                        LABEL_HEIGHT_EMU,
                         font_size=LABEL_FONT_SIZE,
                         font_color=ICON_LABEL_COLOR,
                         alignment=PP_ALIGN.CENTER,
                     )
+                    shape_id += 1
 
                     total_icons += 1
 
                 rows_placed += 1
-                y_cursor += Inches(ROW_HEIGHT_IN)
+                y_cursor += ROW_HEIGHT_EMU
 
     # --- Save ---
     os.makedirs(OUTPUT_DIR, exist_ok=True)
-    prs.save(OUTPUT_PATH)
+    save_presentation(prs, OUTPUT_PATH, args.compresslevel)
     file_size = os.path.getsize(OUTPUT_PATH)
 
     # --- Report ---
@@ -6,7 +6,8 @@ Reads metadata.json and produces:
   1. word-mark-generator/curated-icons.json  — consumed by the word mark HTML app
   2. output/Humanitarian_icons.csv           — shareable CSV of all icons
 
-No external dependencies — uses only the Python standard library.
+No external dependencies — uses only the Python standard library. If
+orjson is installed it is used for reading and writing JSON (same output).
 
 Usage:
     python scripts/generate-wordmark.py
@@ -18,6 +19,12 @@ import json
 import os
 from pathlib import Path
 
+try:
+    import orjson
+    HAVE_ORJSON = True
+except ImportError:
+    HAVE_ORJSON = False
+
 
 # ---------------------------------------------------------------------------
 # Paths
@@ -39,6 +46,8 @@ CDN_BASE = (
 
 def load_metadata() -> dict:
     """Load and return the parsed metadata.json."""
+    if HAVE_ORJSON:
+        return orjson.loads(METADATA_PATH.read_bytes())
     with open(METADATA_PATH, encoding="utf-8") as f:
         return json.load(f)
 
@@ -73,7 +82,9 @@ def icons_by_family(metadata: dict) -> dict[str, list[tuple[str, dict]]]:
 # Output 1: curated-icons.json
 # ---------------------------------------------------------------------------
 
-def build_curated_json(metadata: dict) -> dict:
+def build_curated_json(
+    metadata: dict, grouped: dict[str, list[tuple[str, dict]]]
+) -> dict:
     """
     Build the curated-icons.json structure:
 
@@ -95,33 +106,24 @@ def build_curated_json(metadata: dict) -> dict:
 
     - categories: ALL icons grouped by family (full list).
     - icons: ONLY those with wordmark == true (the curated subset).
+
+    ``grouped`` is the result of icons_by_family(metadata).
     """
     families_order = metadata["families"]
-    grouped = icons_by_family(metadata)
 
-    # Build the categories array — every icon, grouped by family order
-    categories = []
-    for family in families_order:
-        icon_names = [icon["name"] for _key, icon in grouped.get(family, [])]
-        categories.append({
-            "name": family,
-            "icons": icon_names,
-        })
-
-    # Handle any families not in the canonical order (safety net)
+    # Canonical family order, then any families not in it (safety net)
     known = set(families_order)
-    for family in grouped:
-        if family not in known:
-            icon_names = [icon["name"] for _key, icon in grouped[family]]
-            categories.append({
-                "name": family,
-                "icons": icon_names,
-            })
-
-    # Build the icons array — only wordmark: true icons
+    family_names = list(families_order)
+    family_names.extend(family for family in grouped if family not in known)
+
+    # One pass builds both arrays: categories lists every icon by family,
+    # curated_icons only the wordmark: true ones
+    categories = []
     curated_icons = []
-    for family in families_order:
+    for family in family_names:
+        icon_names = []
         for key, icon in grouped.get(family, []):
+            icon_names.append(icon["name"])
             if icon.get("wordmark"):
                 curated_icons.append({
                     "name": icon["name"],
@@ -129,18 +131,10 @@ def build_curated_json(metadata: dict) -> dict:
                     "verticalAdjustment": icon.get("wordmark_valign", 0),
                     "category": icon["family"],
                 })
-
-    # Also pick up wordmark icons from unknown families (safety net)
-    for family in grouped:
-        if family not in known:
-            for key, icon in grouped[family]:
-                if icon.get("wordmark"):
-                    curated_icons.append({
-                        "name": icon["name"],
-                        "url": f"{CDN_BASE}{key}.svg",
-                        "verticalAdjustment": icon.get("wordmark_valign", 0),
-                        "category": icon["family"],
-                    })
+        categories.append({
+            "name": family,
+            "icons": icon_names,
+        })
 
     return {
         "categories": categories,
@@ -151,6 +145,11 @@ def build_curated_json(metadata: dict) -> dict:
 def write_curated_json(data: dict) -> None:
     """Write curated-icons.json with 2-space indentation."""
     CURATED_JSON_PATH.parent.mkdir(parents=True, exist_ok=True)
+    if HAVE_ORJSON:
+        CURATED_JSON_PATH.write_bytes(
+            orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE)
+        )
+        return
     with open(CURATED_JSON_PATH, "w", encoding="utf-8") as f:
         json.dump(data, f, indent=2, ensure_ascii=False)
         f.write("\n")  # trailing newline
@@ -160,7 +159,7 @@ def write_curated_json(data: dict) -> None:
 # Output 2: Humanitarian_icons.csv
 # ---------------------------------------------------------------------------
 
-def write_csv(metadata: dict) -> int:
+def write_csv(metadata: dict, grouped: dict[str, list[tuple[str, dict]]]) -> int:
     """
     Write a UTF-8 CSV (with BOM) containing all icons.
 
@@ -169,32 +168,32 @@ def write_csv(metadata: dict) -> int:
         Clusters,Camp coordination and camp management
         ...
 
-    Returns the number of data rows written.
+    ``grouped`` is the result of icons_by_family(metadata). Returns the
+    number of data rows written.
     """
-    grouped = icons_by_family(metadata)
     families_order = metadata["families"]
 
-    CSV_PATH.parent.mkdir(parents=True, exist_ok=True)
+    # Every row up front, then one writerows call
+    rows = [["Family", "Icon Name"]]
+    rows.extend(
+        [family, icon["name"]]
+        for family in families_order
+        for _key, icon in grouped.get(family, [])
+    )
+    # Safety net for unknown families
+    known = set(families_order)
+    rows.extend(
+        [family, icon["name"]]
+        for family in grouped
+        if family not in known
+        for _key, icon in grouped[family]
+    )
 
-    row_count = 0
+    CSV_PATH.parent.mkdir(parents=True, exist_ok=True)
     with open(CSV_PATH, "w", encoding="utf-8-sig", newline="") as f:
-        writer = csv.writer(f)
-        writer.writerow(["Family", "Icon Name"])
-
-        for family in families_order:
-            for _key, icon in grouped.get(family, []):
-                writer.writerow([family, icon["name"]])
-                row_count += 1
+        csv.writer(f).writerows(rows)
 
-        # Safety net for unknown families
-        known = set(families_order)
-        for family in grouped:
-            if family not in known:
-                for _key, icon in grouped[family]:
-                    writer.writerow([family, icon["name"]])
-                    row_count += 1
-
-    return row_count
+    return len(rows) - 1
 
 
 # ---------------------------------------------------------------------------
@@ -210,8 +209,11 @@ def main() -> None:
     total_icons = len(icons)
     print(f"  Found {total_icons} icons across {len(families)} families")
 
+    # Grouped and sorted once, shared by both outputs
+    grouped = icons_by_family(metadata)
+
     # --- curated-icons.json ---
-    curated_data = build_curated_json(metadata)
+    curated_data = build_curated_json(metadata, grouped)
     write_curated_json(curated_data)
 
     num_categories = len(curated_data["categories"])
@@ -223,7 +225,7 @@ def main() -> None:
     print(f"    wordmark icons: {num_wordmark}")
 
     # --- CSV ---
-    csv_rows = write_csv(metadata)
+    csv_rows = write_csv(metadata, grouped)
     print(f"  Wrote {CSV_PATH}")
     print(f"    {csv_rows} data rows (UTF-8 with BOM)")
 
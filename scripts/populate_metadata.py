@@ -12,15 +12,28 @@ Reads from three sources:
 Outputs: metadata.json at the repo root.
 """
 
+import functools
 import json
 import os
 import re
 import sys
-from collections import OrderedDict
+from collections import Counter, namedtuple
 from pathlib import Path
 
 import openpyxl
 
+try:
+    import orjson
+    HAVE_ORJSON = True
+except ImportError:
+    HAVE_ORJSON = False
+
+try:
+    from rapidfuzz import fuzz, process
+    HAVE_RAPIDFUZZ = True
+except ImportError:
+    HAVE_RAPIDFUZZ = False
+
 # ──────────────────────────────────────────────────────────────────────
 # Paths
 # ──────────────────────────────────────────────────────────────────────
@@ -77,6 +90,14 @@ MANUAL_SVG_TO_EXCEL = {
     "Top-ranking": "Top Ranking",
 }
 
+# Minimum rapidfuzz token_sort_ratio score (0-100) for suggesting an Excel
+# row for an unmatched SVG. Suggestions are only printed, never applied:
+# add the good ones to MANUAL_SVG_TO_EXCEL. Needs rapidfuzz installed.
+FUZZY_SCORE_CUTOFF = 90
+
+# One data row of the Excel sheet
+ExcelRow = namedtuple("ExcelRow", "family name font_code ppt")
+
 # SVGs that exist but have NO Excel row (truly new / extra icons).
 # These will get metadata entries with family="Unassigned".
 # We will log them.
@@ -84,17 +105,37 @@ MANUAL_SVG_TO_EXCEL = {
 # ──────────────────────────────────────────────────────────────────────
 # Helpers
 # ──────────────────────────────────────────────────────────────────────
+PAREN_RE = re.compile(r"\(.*?\)")
+WHITESPACE_RE = re.compile(r"\s+")
+SEPARATORS_TO_SPACE = str.maketrans("-_,", "   ")
+
 
+@functools.lru_cache(maxsize=None)
 def normalize(s: str) -> str:
     """Lowercase, strip, replace hyphens/underscores/commas with spaces,
-    collapse whitespace, remove parentheticals."""
+    collapse whitespace, remove parentheticals. Memoised: the same keys and
+    names are normalised again in several steps."""
     s = s.strip().lower()
-    s = re.sub(r"\(.*?\)", "", s)          # remove parentheticals
-    s = s.replace("-", " ").replace("_", " ").replace(",", " ")
-    s = re.sub(r"\s+", " ", s).strip()
+    s = PAREN_RE.sub("", s)                 # remove parentheticals
+    s = s.translate(SEPARATORS_TO_SPACE)
+    s = WHITESPACE_RE.sub(" ", s).strip()
     return s
 
 
+def url_svg_key(url: str) -> str | None:
+    """Return the SVG key from a URL ending in /{KEY}.svg, or None."""
+    _, slash, tail = url.rpartition("/")
+    if slash and len(tail) > 4 and tail.endswith(".svg"):
+        return tail[:-4]
+    return None
+
+
+def print_lines(lines) -> None:
+    """Write a block of log lines to stdout in one call."""
+    if lines:
+        sys.stdout.write("\n".join(lines) + "\n")
+
+
 def svg_key_to_normalized(key: str) -> str:
     return normalize(key)
 
@@ -110,9 +151,12 @@ print("=" * 70)
 print("STEP 1: Scanning SVG folder")
 print("=" * 70)
 
-svg_keys = sorted(
-    [f[:-4] for f in os.listdir(SVG_DIR) if f.endswith(".svg")]
-)
+with os.scandir(SVG_DIR) as entries:
+    svg_keys = sorted(
+        e.name[:-4] for e in entries
+        if e.name.endswith(".svg") and e.is_file(follow_symlinks=False)
+    )
+svg_norms = {k: svg_key_to_normalized(k) for k in svg_keys}
 print(f"  Found {len(svg_keys)} SVG files.\n")
 
 
@@ -123,31 +167,25 @@ print("=" * 70)
 print("STEP 2: Reading Excel file")
 print("=" * 70)
 
-wb = openpyxl.load_workbook(str(EXCEL_PATH))
-ws = wb.active
+if not EXCEL_PATH.is_file():
+    print(f"ERROR: Excel file not found at {EXCEL_PATH}")
+    sys.exit(1)
 
-excel_rows = []  # list of dicts: {family, name, font_code, ppt}
-for row_idx in range(2, ws.max_row + 1):
-    family = ws.cell(row_idx, 1).value
-    name = ws.cell(row_idx, 2).value
-    font_code = ws.cell(row_idx, 3).value
-    ppt = ws.cell(row_idx, 4).value
+# Read-only mode streams the sheet instead of loading every cell and style
+wb = openpyxl.load_workbook(EXCEL_PATH, read_only=True, data_only=True, keep_links=False)
+ws = wb.active
 
+excel_rows = []  # list of ExcelRow(family, name, font_code, ppt)
+append = excel_rows.append
+for family, name, font_code, ppt in ws.iter_rows(min_row=2, max_col=4, values_only=True):
     if family is None:
         continue  # skip blank rows
 
-    family = family.strip()
-    name = name.strip() if name else ""
-
-    excel_rows.append({
-        "family": family,
-        "name": name,
-        "font_code": font_code,
-        "ppt": ppt,
-    })
+    append(ExcelRow(family.strip(), name.strip() if name else "", font_code, ppt))
+wb.close()
 
 print(f"  Read {len(excel_rows)} data rows from Excel.")
-print(f"  Families found: {len(set(r['family'] for r in excel_rows))}\n")
+print(f"  Families found: {len(set(r.family for r in excel_rows))}\n")
 
 
 # ──────────────────────────────────────────────────────────────────────
@@ -165,19 +203,11 @@ curator_icons = curator["icons"]  # 43 wordmark-approved icons
 
 # Build a set of wordmark icon names and their verticalAdjustment
 # Also extract SVG key from URL where possible
-wordmark_by_name = {}      # normalized display name -> curator entry
-wordmark_by_svgkey = {}    # SVG key extracted from URL -> curator entry
-
-for ci in curator_icons:
-    norm = normalize(ci["name"])
-    wordmark_by_name[norm] = ci
-
-    # Extract SVG key from URL: .../SVG/UN-blue/{KEY}.svg
-    url = ci.get("url", "")
-    match = re.search(r"/([^/]+)\.svg$", url)
-    if match:
-        svgkey = match.group(1)
-        wordmark_by_svgkey[svgkey] = ci
+# normalized display name -> curator entry
+wordmark_by_name = {normalize(ci["name"]): ci for ci in curator_icons}
+# SVG key extracted from URL (.../SVG/UN-blue/{KEY}.svg) -> curator entry
+wordmark_by_svgkey = {svgkey: ci for ci in curator_icons
+                      if (svgkey := url_svg_key(ci.get("url", "")))}
 
 print(f"  {len(curator_icons)} wordmark-approved icons found.")
 print(f"  {len(curator_categories)} categories in curator JSON.\n")
@@ -191,21 +221,28 @@ print("STEP 4: Matching SVG filenames to Excel rows")
 print("=" * 70)
 
 # Build lookup from normalized Excel name -> excel_row
-excel_by_norm = {}
-for er in excel_rows:
-    norm = excel_name_to_normalized(er["name"])
-    if norm in excel_by_norm:
-        print(f"  WARNING: Duplicate normalized Excel name: '{norm}' "
-              f"({er['name']} vs {excel_by_norm[norm]['name']})")
-    excel_by_norm[norm] = er
+# (the last row wins when two names normalize the same)
+excel_norms = [excel_name_to_normalized(er.name) for er in excel_rows]
+excel_by_norm = dict(zip(excel_norms, excel_rows))
+
+duplicate_norms = {n for n, c in Counter(excel_norms).items() if c > 1}
+if duplicate_norms:
+    warnings = []
+    seen = {}
+    for norm, er in zip(excel_norms, excel_rows):
+        if norm in duplicate_norms:
+            if norm in seen:
+                warnings.append(f"  WARNING: Duplicate normalized Excel name: "
+                                f"'{norm}' ({er.name} vs {seen[norm].name})")
+            seen[norm] = er
+    print_lines(warnings)
 
 # Also build lookup by exact name (stripped)
-excel_by_exact = {er["name"]: er for er in excel_rows}
+excel_by_exact = {er.name: er for er in excel_rows}
 
 # Match each SVG key to an Excel row
 svg_to_excel = {}      # svg_key -> excel_row
 unmatched_svgs = []    # svg keys with no match
-matched_excel = set()  # track which excel rows got matched
 
 for svg_key in svg_keys:
     matched = False
@@ -215,14 +252,12 @@ for svg_key in svg_keys:
         excel_name = MANUAL_SVG_TO_EXCEL[svg_key]
         if excel_name in excel_by_exact:
             svg_to_excel[svg_key] = excel_by_exact[excel_name]
-            matched_excel.add(excel_name)
             matched = True
         else:
             # Try normalized
             norm = normalize(excel_name)
             if norm in excel_by_norm:
                 svg_to_excel[svg_key] = excel_by_norm[norm]
-                matched_excel.add(excel_by_norm[norm]["name"])
                 matched = True
 
     if not matched:
@@ -230,35 +265,56 @@ for svg_key in svg_keys:
         #    like "Case-management", "Exit-Cancel", "Work-from-home" etc.)
         if svg_key in excel_by_exact:
             svg_to_excel[svg_key] = excel_by_exact[svg_key]
-            matched_excel.add(svg_key)
             matched = True
 
     if not matched:
         # 3) Normalized fuzzy match
-        svg_norm = svg_key_to_normalized(svg_key)
+        svg_norm = svg_norms[svg_key]
         if svg_norm in excel_by_norm:
             svg_to_excel[svg_key] = excel_by_norm[svg_norm]
-            matched_excel.add(excel_by_norm[svg_norm]["name"])
             matched = True
 
     if not matched:
         unmatched_svgs.append(svg_key)
 
-# Find unmatched Excel rows
-unmatched_excel = []
-for er in excel_rows:
-    if er["name"] not in matched_excel:
-        unmatched_excel.append(er)
+# Find unmatched Excel rows. Track rows by identity, not name, so a
+# duplicate row is reported even when another row with its name matched.
+matched_excel_ids = {id(er) for er in svg_to_excel.values()}
+unmatched_excel = [er for er in excel_rows if id(er) not in matched_excel_ids]
+
+# Closest unmatched Excel row for each unmatched SVG, as a suggestion only
+suggestions = []       # (svg_key, excel name, score)
+if HAVE_RAPIDFUZZ and unmatched_svgs and unmatched_excel:
+    candidates = {normalize(er.name): er for er in unmatched_excel}
+    candidate_norms = list(candidates)
+    for svg_key in unmatched_svgs:
+        best = process.extractOne(svg_norms[svg_key], candidate_norms,
+                                  scorer=fuzz.token_sort_ratio, processor=None,
+                                  score_cutoff=FUZZY_SCORE_CUTOFF)
+        if best is not None:
+            suggestions.append((svg_key, candidates[best[0]].name, best[1]))
 
 print(f"\n  Matched: {len(svg_to_excel)} SVG files to Excel rows.")
 print(f"  Unmatched SVGs (no Excel row): {len(unmatched_svgs)}")
-for s in unmatched_svgs:
-    print(f"    - {s}")
+print_lines([f"    - {s}" for s in unmatched_svgs])
 print(f"  Unmatched Excel rows (no SVG): {len(unmatched_excel)}")
-for er in unmatched_excel:
-    print(f"    - \"{er['name']}\" (family: {er['family']})")
+print_lines([f"    - \"{er.name}\" (family: {er.family})"
+             for er in unmatched_excel])
+if suggestions:
+    print(f"  Suggested MANUAL_SVG_TO_EXCEL entries (not applied): "
+          f"{len(suggestions)}")
+    print_lines([f"    \"{svg_key}\": \"{name}\",  # score {score:.0f}"
+                 for svg_key, name, score in suggestions])
 print()
 
+# Display name per SVG key (Excel name if matched, else the key itself),
+# its normalized form, and the reverse lookup normalized name -> SVG key.
+# Shared by Steps 5 and 7 so each name is normalized once.
+display_for = {k: svg_to_excel[k].name if k in svg_to_excel else k
+               for k in svg_keys}
+display_norms = {k: normalize(v) for k, v in display_for.items()}
+norm_to_svgkey = {v: k for k, v in display_norms.items()}
+
 
 # ──────────────────────────────────────────────────────────────────────
 # Step 5: Match wordmark flags from curator JSON
@@ -267,10 +323,7 @@ print("=" * 70)
 print("STEP 5: Matching wordmark flags from Curator JSON")
 print("=" * 70)
 
-wordmark_matches = 0
-wordmark_details = []
-
-def get_wordmark_info(svg_key, display_name):
+def get_wordmark_info(svg_key):
     """Return (is_wordmark, vertical_adjustment) for a given icon."""
     # Try by SVG key first (most reliable)
     if svg_key in wordmark_by_svgkey:
@@ -278,7 +331,7 @@ def get_wordmark_info(svg_key, display_name):
         return True, ci.get("verticalAdjustment", 0)
 
     # Try by normalized display name
-    norm = normalize(display_name)
+    norm = display_norms[svg_key]
     if norm in wordmark_by_name:
         ci = wordmark_by_name[norm]
         return True, ci.get("verticalAdjustment", 0)
@@ -286,51 +339,31 @@ def get_wordmark_info(svg_key, display_name):
     return False, 0
 
 
-for svg_key in svg_keys:
-    if svg_key in svg_to_excel:
-        display_name = svg_to_excel[svg_key]["name"]
-    else:
-        display_name = svg_key
-
-    is_wm, va = get_wordmark_info(svg_key, display_name)
-    if is_wm:
-        wordmark_matches += 1
-        wordmark_details.append((svg_key, display_name, va))
+# Computed once per icon; Step 7 reuses it
+wordmark_info = {k: get_wordmark_info(k) for k in svg_keys}
+wordmark_matches = sum(is_wm for is_wm, _ in wordmark_info.values())
 
 print(f"  Wordmark icons matched: {wordmark_matches} / {len(curator_icons)}")
 if wordmark_matches != len(curator_icons):
-    # Check which curator icons didn't match
-    matched_curator_keys = set()
-    for svg_key in svg_keys:
-        if svg_key in wordmark_by_svgkey:
-            matched_curator_keys.add(svg_key)
+    # Check which curator icons didn't match (skipped when all matched)
+    matched_curator_keys = wordmark_by_svgkey.keys() & svg_norms.keys()
+    unmatched_lines = []
     for ci in curator_icons:
-        url = ci.get("url", "")
-        match = re.search(r"/([^/]+)\.svg$", url)
-        if match:
-            svgkey = match.group(1)
-            if svgkey not in matched_curator_keys:
-                # check by name
-                norm = normalize(ci["name"])
-                found = False
-                for svg_key in svg_keys:
-                    if svg_key in svg_to_excel:
-                        dn = svg_to_excel[svg_key]["name"]
-                    else:
-                        dn = svg_key
-                    if normalize(dn) == norm:
-                        found = True
-                        break
-                if not found:
-                    print(f"    UNMATCHED curator icon: {ci['name']} "
-                          f"(URL key: {svgkey})")
+        svgkey = url_svg_key(ci.get("url", ""))
+        if svgkey:
+            # Not matched by key; fall back to a match by display name
+            if (svgkey not in matched_curator_keys
+                    and normalize(ci["name"]) not in norm_to_svgkey):
+                unmatched_lines.append(f"    UNMATCHED curator icon: {ci['name']} "
+                                       f"(URL key: {svgkey})")
+    print_lines(unmatched_lines)
 
 print()
-if wordmark_details:
+if wordmark_matches:
+    # Only wordmark icons can have a non-zero adjustment
     print("  Wordmark icons with non-zero verticalAdjustment:")
-    for key, name, va in wordmark_details:
-        if va != 0:
-            print(f"    - {key}: verticalAdjustment={va}")
+    print_lines([f"    - {key}: verticalAdjustment={va}"
+                 for key, (_, va) in wordmark_info.items() if va != 0])
 print()
 
 
@@ -345,10 +378,8 @@ print("=" * 70)
 sorted_keys = sorted(svg_keys, key=lambda k: k.lower())
 
 codepoint_start = 0xE001
-codepoint_map = {}
-for i, key in enumerate(sorted_keys):
-    cp = codepoint_start + i
-    codepoint_map[key] = f"U+{cp:04X}"
+codepoint_map = {key: f"U+{cp:04X}"
+                 for cp, key in enumerate(sorted_keys, start=codepoint_start)}
 
 next_codepoint = codepoint_start + len(sorted_keys)
 print(f"  Assigned {len(sorted_keys)} codepoints: "
@@ -363,42 +394,45 @@ print("=" * 70)
 print("STEP 7: Building metadata.json")
 print("=" * 70)
 
-icons_dict = OrderedDict()
+icons_dict = {}
 
 for key in sorted_keys:
     if key in svg_to_excel:
         er = svg_to_excel[key]
-        display_name = er["name"]
-        family = er["family"]
+        display_name = er.name
+        family = er.family
     else:
         # Unmatched SVG -- derive display name from key
         display_name = key.replace("-", " ").replace("_", " ")
         family = "Unassigned"
 
-    is_wm, va = get_wordmark_info(key, display_name)
-
-    icons_dict[key] = OrderedDict([
-        ("name", display_name),
-        ("family", family),
-        ("wordmark", is_wm),
-        ("wordmark_valign", va),
-        ("font_codepoint", codepoint_map[key]),
-        ("date_added", TODAY),
-    ])
-
-metadata = OrderedDict([
-    ("meta", OrderedDict([
-        ("version", "2.0"),
-        ("last_updated", TODAY),
-        ("next_font_codepoint", f"U+{next_codepoint:04X}"),
-    ])),
-    ("families", FAMILY_ORDER),
-    ("icons", icons_dict),
-])
-
-# Write the file
-with open(OUTPUT_PATH, "w", encoding="utf-8") as f:
-    json.dump(metadata, f, indent=2, ensure_ascii=False)
+    is_wm, va = wordmark_info[key]
+
+    icons_dict[key] = {
+        "name": display_name,
+        "family": family,
+        "wordmark": is_wm,
+        "wordmark_valign": va,
+        "font_codepoint": codepoint_map[key],
+        "date_added": TODAY,
+    }
+
+metadata = {
+    "meta": {
+        "version": "2.0",
+        "last_updated": TODAY,
+        "next_font_codepoint": f"U+{next_codepoint:04X}",
+    },
+    "families": FAMILY_ORDER,
+    "icons": icons_dict,
+}
+
+# Write the file (orjson emits the same 2-space, non-ASCII-escaped layout)
+if HAVE_ORJSON:
+    OUTPUT_PATH.write_bytes(orjson.dumps(metadata, option=orjson.OPT_INDENT_2))
+else:
+    with open(OUTPUT_PATH, "w", encoding="utf-8") as f:
+        json.dump(metadata, f, indent=2, ensure_ascii=False)
 
 print(f"  Written {len(icons_dict)} icon entries to {OUTPUT_PATH}")
 print(f"  File size: {os.path.getsize(OUTPUT_PATH):,} bytes\n")
@@ -416,11 +450,10 @@ print(f"  Curator wordmark icons:    {len(curator_icons)}")
 print()
 print(f"  SVGs matched to Excel:     {len(svg_to_excel)}")
 print(f"  SVGs unmatched (no Excel): {len(unmatched_svgs)}")
-for s in unmatched_svgs:
-    print(f"    - {s}")
+print_lines([f"    - {s}" for s in unmatched_svgs])
 print(f"  Excel rows unmatched:      {len(unmatched_excel)}")
-for er in unmatched_excel:
-    print(f"    - \"{er['name']}\" (family: {er['family']})")
+print_lines([f"    - \"{er.name}\" (family: {er.family})"
+             for er in unmatched_excel])
 print()
 print(f"  Wordmark icons matched:    {wordmark_matches} / {len(curator_icons)}")
 print(f"  Font codepoints assigned:  {len(codepoint_map)}")
@@ -435,8 +468,8 @@ assert len(icons_dict) == len(svg_keys), \
 unassigned = [k for k, v in icons_dict.items() if v["family"] == "Unassigned"]
 if unassigned:
     print(f"  WARNING: {len(unassigned)} icons with family='Unassigned':")
-    for k in unassigned:
-        print(f"    - {k} (display: {icons_dict[k]['name']})")
+    print_lines([f"    - {k} (display: {icons_dict[k]['name']})"
+                 for k in unassigned])
     print()
 
 print("Done.")